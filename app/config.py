@@ -10,12 +10,17 @@ class Settings:
     SECRET_KEY: str = "thisissecretkey123"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # How often each worker picks up revocations made by other workers
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "15"))
     
     # Database
     DATABASE_URL: str = os.getenv(
         "DATABASE_URL", 
         "sqlite:///./test.db"
     )
+    # Create tables when a worker starts. Off by default; run `python manage.py bootstrap` instead.
+    DB_AUTO_CREATE: bool = os.getenv("DB_AUTO_CREATE", "false").lower() == "true"
     
     # Application
     APP_NAME: str = "JWT Authentication & RBAC API"
@@ -23,6 +28,52 @@ class Settings:
     
     # API
     API_V1_STR: str = "/api/v1"
+
+    # Response caching
+    RESPONSE_CACHE_MAXSIZE: int = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "1024"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+    RESPONSE_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("RESPONSE_CACHE_MAX_AGE_SECONDS", "0"))
+    STATIC_CACHE_MAXSIZE: int = int(os.getenv("STATIC_CACHE_MAXSIZE", "256"))
+    STATIC_CACHE_TTL_SECONDS: float = float(os.getenv("STATIC_CACHE_TTL_SECONDS", "300"))
+    STATIC_CACHE_MAX_FILE_BYTES: int = int(os.getenv("STATIC_CACHE_MAX_FILE_BYTES", str(256 * 1024)))
+    STATIC_MAX_AGE_SECONDS: int = int(os.getenv("STATIC_MAX_AGE_SECONDS", "3600"))
+
+    # Chat history and reactions
+    CHAT_HISTORY_LIMIT: int = int(os.getenv("CHAT_HISTORY_LIMIT", "50"))
+    CHAT_HISTORY_CACHE_ROOMS: int = int(os.getenv("CHAT_HISTORY_CACHE_ROOMS", "512"))
+    CHAT_HISTORY_CACHE_TTL_SECONDS: float = float(os.getenv("CHAT_HISTORY_CACHE_TTL_SECONDS", "300"))
+    REACTION_FLUSH_SECONDS: float = float(os.getenv("REACTION_FLUSH_SECONDS", "5"))
+    # Live reaction state is kept for this many recently reacted-to messages
+    REACTION_CACHE_MESSAGES: int = int(os.getenv("REACTION_CACHE_MESSAGES", "10000"))
+    REACTION_CACHE_TTL_SECONDS: float = float(os.getenv("REACTION_CACHE_TTL_SECONDS", "3600"))
+    MAX_EMOJI_LENGTH: int = 32
+
+    # WebSocket fan-out: clients that can't take a message within this are dropped
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+    # Room sharding: 0 runs room work inline on the event loop
+    ROOM_SHARDS: int = int(os.getenv("ROOM_SHARDS", "0"))
+    ROOM_SHARD_VNODES: int = int(os.getenv("ROOM_SHARD_VNODES", "64"))
+
+    # Bulk import/export
+    TRANSFER_CHUNK_SIZE: int = int(os.getenv("TRANSFER_CHUNK_SIZE", "5000"))
+
+    # Notification outbox: off unless enabled with a sink; "file" and "queue" are for testing
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+    OUTBOX_WORKERS: int = int(os.getenv("OUTBOX_WORKERS", "4"))
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_POLL_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2.0"))
+    OUTBOX_LEASE_SECONDS: int = int(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_BACKOFF_BASE_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "2.0"))
+    OUTBOX_BACKOFF_MAX_SECONDS: float = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "900.0"))
+    OUTBOX_SINK: str = os.getenv("OUTBOX_SINK", "")  # "webhook", "file" or "queue"
+    OUTBOX_WEBHOOK_URL: str = os.getenv("OUTBOX_WEBHOOK_URL", "")
+    OUTBOX_WEBHOOK_TIMEOUT_SECONDS: float = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT_SECONDS", "5.0"))
+    OUTBOX_FILE_PATH: str = os.getenv("OUTBOX_FILE_PATH", "./notifications.ndjson")
+    # Delivered and failed entries are deleted this long after they were created
+    OUTBOX_RETENTION_HOURS: float = float(os.getenv("OUTBOX_RETENTION_HOURS", "168"))
+    OUTBOX_PURGE_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_PURGE_INTERVAL_SECONDS", "3600"))
     
     class Config:
         case_sensitive = True
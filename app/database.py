@@ -1,6 +1,8 @@
 """
 Database connection and session management.
 """
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel, create_engine
 from app.config import settings
 
@@ -16,6 +18,45 @@ def get_session():
 def create_db_and_tables():
     """
     Create all database tables.
+
+    Run once per deployment via ``python manage.py bootstrap`` rather than
+    on every worker boot.
     """
+    # Register every table on the metadata, whichever modules were imported so far
+    import app.models.user, app.models.room, app.models.message, app.models.notification, app.models.token  # noqa: F401
     SQLModel.metadata.create_all(engine)
+    add_missing_columns(engine)
+
+def add_missing_columns(bind: Engine) -> None:
+    """
+    Add columns that the models define but existing tables lack.
+
+    ``create_all`` only creates missing tables, so a database created by an
+    older version would fail on newer columns (e.g. ``messages.edited_at``).
+    Safe to run repeatedly. Only nullable columns, or columns with a scalar
+    default, can be added this way; anything else needs a manual migration.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = column.type.compile(dialect=bind.dialect)
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if default is not None:
+                    ddl += " DEFAULT " + str(literal(default, column.type).compile(
+                        dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+                    ))
+                if not column.nullable:
+                    if default is None:
+                        raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a default")
+                    ddl += " NOT NULL"
+                connection.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {ddl}"))
+                print(f"Added column {table.name}.{column.name}.")
     
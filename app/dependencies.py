@@ -1,8 +1,8 @@
 from fastapi import HTTPException, Depends, WebSocket, WebSocketException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from app.models.user import User
-from app.utils.enums import UserRole
+from app.services.revocation_index import revocation_index
+from app.utils.enums import UserRole, TokenType
 from app.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -10,6 +10,13 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 
+def _is_usable_access_token(payload: dict) -> bool:
+    """Reject refresh tokens and tokens whose ID or session was revoked."""
+    # Tokens issued before token types existed have no "type" claim
+    if payload.get("type", TokenType.ACCESS.value) != TokenType.ACCESS.value:
+        return False
+    return not revocation_index.is_revoked(payload.get("jti"), payload.get("sid"))
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Retrieve the current user from the JWT token.
@@ -20,10 +27,12 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     Returns:
         User object if token is valid    
     """
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or not _is_usable_access_token(payload):
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         return User(username=username, role=UserRole(payload.get("role")))
     except JWTError:
@@ -55,11 +64,15 @@ async def get_websocket_user(
     """
     Authenticates a WebSocket connection using a JWT token from query parameters.
     This function mirrors the logic of get_current_user for WebSocket context.
+    The token claims are kept on ``websocket.state.token_claims`` so the
+    connection can be closed if its token or session is revoked later.
     """
     credentials_exception = WebSocketException(
         code=status.WS_1008_POLICY_VIOLATION,
         reason="Could not validate WebSocket credentials."
     )
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -67,7 +80,10 @@ async def get_websocket_user(
 
         if username is None or user_role_str is None:
             raise credentials_exception
-        
+        if not _is_usable_access_token(payload):
+            raise credentials_exception
+
+        websocket.state.token_claims = payload
         # Construct User object from payload, similar to get_current_user
         return User(username=username, role=UserRole(user_role_str), email="placeholder@example.com", hashed_password="not_needed_for_auth_check")
     except JWTError:
@@ -13,7 +13,24 @@ class Message(SQLModel, table=True):
     user_id: int = Field(index=True, nullable=False, foreign_key="users.id")
     content: str = Field(nullable=False)
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
-    room: Room = Relationship(back_populates="messages")
+    edited_at: Optional[datetime] = None
+    deleted: bool = Field(default=False, nullable=False)
+    room: Optional[Room] = Relationship(
+        back_populates="messages",
+        sa_relationship_kwargs={"primaryjoin": "Room.name == foreign(Message.room_id)", "viewonly": True}
+    )
     
     def __repr__(self):
-        return f"<Message(id={self.id},room_id={self.room_id}, user_id={self.user_id}, content='{self.content[:20]}...')>"
\ No newline at end of file
+        return f"<Message(id={self.id},room_id={self.room_id}, user_id={self.user_id}, content='{self.content[:20]}...')>"
+
+
+class MessageReaction(SQLModel, table=True):
+    """Aggregated reaction count per message and emoji."""
+    __tablename__ = "message_reactions"
+
+    message_id: int = Field(primary_key=True, foreign_key="messages.id")
+    emoji: str = Field(primary_key=True)
+    count: int = Field(default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<MessageReaction(message_id={self.message_id}, emoji='{self.emoji}', count={self.count})>"
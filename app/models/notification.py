@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from app.utils.enums import OutboxStatus
+
+class OutboxEntry(SQLModel, table=True):
+    """Pending notification for a recipient who was offline when a message was sent."""
+    __tablename__ = "notification_outbox"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    message_id: int = Field(index=True, nullable=False, foreign_key="messages.id")
+    recipient: str = Field(index=True, nullable=False)  # recipient username
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING, index=True, nullable=False)
+    attempts: int = Field(default=0, nullable=False)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True, nullable=False)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<OutboxEntry(id={self.id}, message_id={self.message_id}, recipient='{self.recipient}', status='{self.status}')>"
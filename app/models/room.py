@@ -11,7 +11,12 @@ class Room(SQLModel, table=True):
     name: str = Field(unique=True, index=True, nullable=False)
     description: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
-    messages: List["Message"] = Relationship(back_populates="room")
+    # Messages reference rooms by name and may target rooms without a row
+    # (e.g. DMs), so there is no foreign key; the join is read-only
+    messages: List["Message"] = Relationship(
+        back_populates="room",
+        sa_relationship_kwargs={"primaryjoin": "Room.name == foreign(Message.room_id)", "viewonly": True}
+    )
     
     def __repr__(self):
         return f"<Room(id={self.id}, name='{self.name}', created_at={self.created_at.isoformat()})>"
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from sqlmodel import Field, SQLModel
+
+class RevokedToken(SQLModel, table=True):
+    """A revoked token ID (``jti``) or login session ID (``sid``)."""
+    __tablename__ = "revoked_tokens"
+
+    token_id: str = Field(primary_key=True)
+    # Once every token carrying this ID has expired, the entry can be dropped
+    expires_at: datetime = Field(index=True, nullable=False)
+    revoked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<RevokedToken(token_id='{self.token_id}', expires_at={self.expires_at.isoformat()})>"
+
+
+class UsedRefreshToken(SQLModel, table=True):
+    """A refresh token ID (``jti``) already exchanged; presenting it again is reuse."""
+    __tablename__ = "used_refresh_tokens"
+
+    token_id: str = Field(primary_key=True)
+    # The token can't be presented after it expires, so the row can go then
+    expires_at: datetime = Field(index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<UsedRefreshToken(token_id='{self.token_id}', expires_at={self.expires_at.isoformat()})>"
@@ -0,0 +1,85 @@
+"""
+Admin routes for bulk data import and export.
+"""
+import io
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.config import settings
+from app.database import engine, get_session
+from app.dependencies import require_role
+from app.models.user import User
+from app.services.transfer_service import TransferService
+from app.utils.enums import TransferEntity, TransferFormat, UserRole
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+MEDIA_TYPES = {
+    TransferFormat.NDJSON: "application/x-ndjson",
+    TransferFormat.CSV: "text/csv",
+}
+
+@router.get("/export/{entity}")
+def export_entity(
+    entity: TransferEntity,
+    format: TransferFormat = TransferFormat.NDJSON,
+    chunk_size: int = Query(settings.TRANSFER_CHUNK_SIZE, ge=1),
+    current_user: User = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Stream a full table export as NDJSON or CSV. Accessible by admins.
+
+    Password hashes are never included; a user migration that needs them
+    goes through `python manage.py export users`.
+
+    Args:
+        entity: Table to export (users, rooms or messages)
+        format: Output format
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Streaming response; rows are read and written incrementally.
+    """
+    def stream():
+        # The request-scoped session is closed before the body is sent,
+        # so the stream owns its own session for the lifetime of the cursor.
+        with Session(engine) as db:
+            records = TransferService.export_records(db, entity, chunk_size)
+            yield from TransferService.serialize(records, entity, format)
+
+    filename = f"{entity.value}.{format.value}"
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/import/{entity}")
+def import_entity(
+    entity: TransferEntity,
+    file: UploadFile = File(...),
+    format: TransferFormat = TransferFormat.NDJSON,
+    chunk_size: int = Query(settings.TRANSFER_CHUNK_SIZE, ge=1),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Bulk import an NDJSON or CSV upload. Accessible by admins.
+
+    User records may carry a pre-computed ``hashed_password`` (stored as-is)
+    or a plain ``password`` (hashed on import).
+
+    Args:
+        entity: Table to import into (users, rooms or messages)
+        file: Uploaded NDJSON or CSV file
+        format: Input format
+        chunk_size: Rows inserted and committed per batch
+        db: Database session
+
+    Returns:
+        Number of rows imported and chunks committed.
+    """
+    # The upload is spooled to disk by Starlette; read it line by line
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    records = TransferService.parse(lines, format)
+    return TransferService.import_records(db, entity, records, chunk_size, format)
@@ -4,10 +4,12 @@ Authentication routes for signup and login.
 from fastapi import APIRouter, Depends, HTTPException, status, Form
 from sqlmodel import Session
 from app.database import get_session
+from app.dependencies import oauth2_scheme
 from app.models.user import User
 from app.services.user_service import UserService
 from app.services.auth_service import AuthService
 from app.utils.enums import UserRole
+from app.utils.security import decode_token_claims
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -49,7 +51,8 @@ def login(
     """
     User login endpoint.
 
-    Verifies credentials and returns JWT token with embedded role.
+    Verifies credentials and returns JWT token with embedded role, plus a
+    refresh token for obtaining new access tokens without logging in again.
 
     Args:
         username: User's username
@@ -57,7 +60,7 @@ def login(
         db: Database session
 
     Returns:
-        JWT access token and token type in a dictionary.
+        JWT access token, refresh token and token type in a dictionary.
 
     Raises:
         HTTPException: If credentials are invalid
@@ -74,6 +77,49 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = AuthService.create_access_token_for_user(user)
     # Return a dictionary instead of a Token model
-    return {"access_token": access_token, "token_type": "bearer"}
+    return AuthService.create_tokens_for_user(user)
+
+@router.post("/refresh")
+def refresh(
+    refresh_token: str = Form(...),
+    db: Session = Depends(get_session)
+):
+    """
+    Token refresh endpoint.
+
+    Exchanges a refresh token for a new access/refresh token pair. The
+    presented refresh token is revoked (rotation); reusing it revokes the
+    whole session.
+
+    Args:
+        refresh_token: Refresh token from login or a previous refresh
+        db: Database session
+
+    Returns:
+        New access token, refresh token and token type in a dictionary.
+
+    Raises:
+        HTTPException: If the refresh token is invalid, expired or revoked
+    """
+    return AuthService.refresh_tokens(db, refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_session)
+):
+    """
+    Logout endpoint.
+
+    Revokes the session of the presented access token: its access and
+    refresh tokens stop working and its open WebSockets are closed.
+
+    Args:
+        token: Access token from the Authorization header
+        db: Database session
+
+    Raises:
+        HTTPException: If the token is invalid or expired
+    """
+    AuthService.revoke_session(db, decode_token_claims(token))
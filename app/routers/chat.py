@@ -1,54 +1,121 @@
 import json
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query, HTTPException, status
 from sqlmodel import Session
+from app.config import settings
 from app.database import get_session
 from app.dependencies import get_websocket_user
 from app.services.chat_service import ChatService
+from app.services.connection_manager import ConnectionManager
+from app.services.message_cache import message_history_cache
+from app.services.outbox_worker import outbox_worker
+from app.services.revocation_index import revocation_index
+from app.services.room_shards import room_shards
+from app.services.user_service import UserService
 from app.models.message import Message
 from app.models.user import User
+from app.utils.enums import ChatEventType, MessageAction
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-
-    async def connect(self, websocket: WebSocket, room_id: str):
-        await websocket.accept()
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(websocket)
-        print(f"User connected to room {room_id}. Total connections in room: {len(self.active_connections[room_id])}")
-
-    def disconnect(self, websocket: WebSocket, room_id: str):
-        if room_id in self.active_connections:
-            self.active_connections[room_id].remove(websocket)
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id] # Clean up empty rooms
-            print(f"User disconnected from room {room_id}. Remaining connections in room: {len(self.active_connections.get(room_id, []))}")
-        
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-
-    async def broadcast(self, message: Dict[str, Any], room_id: str):
-        """Broadcasts a message (as JSON string) to all clients in a specific room."""
-        # Ensure the message is JSON serializable
-        message_str = json.dumps(message, default=str) # default=str handles datetime serialization
-        
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
-                try:
-                    await connection.send_text(message_str)
-                except RuntimeError as e:
-                    print(f"Error sending to WebSocket in room {room_id}: {e}")
-                    # Optionally handle disconnection here if error indicates broken pipe
-                except Exception as e:
-                    print(f"Unexpected error broadcasting: {e}")
-
 manager = ConnectionManager()
+revocation_index.add_listener(manager.close_revoked)
+
+def parse_message_action(data: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the request if a frame is a message action (JSON with an "action"
+    key), or None if it is plain message content.
+    """
+    if not data.startswith("{"):
+        return None
+    try:
+        request = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(request, dict) and "action" in request:
+        return request
+    return None
+
+def apply_message_action(db: Session, room_id: str, user_id: Optional[int], request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Apply an edit, delete or reaction and return it as a small delta event,
+    to be broadcast instead of re-sending the whole message. Returns None
+    if a reaction changed nothing, so there is nothing to broadcast.
+
+    Raises:
+        HTTPException: If the request is malformed, the message is not found
+            or the user may not change it
+    """
+    try:
+        action = MessageAction(request.get("action"))
+        message_id = int(request.get("message_id"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid message action")
+
+    if action == MessageAction.EDIT:
+        content = request.get("content")
+        if not isinstance(content, str) or not content.strip():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content is required")
+        message = ChatService.edit_message(db, room_id, message_id, user_id, content)
+        edited_at = message.edited_at.isoformat()
+        message_history_cache.update(room_id, message.id, content=message.content, edited_at=edited_at)
+        return {
+            "type": ChatEventType.MESSAGE_EDITED.value,
+            "id": message.id,
+            "room_id": room_id,
+            "content": message.content,
+            "edited_at": edited_at
+        }
+    if action == MessageAction.DELETE:
+        message = ChatService.delete_message(db, room_id, message_id, user_id)
+        message_history_cache.remove(room_id, message.id)
+        return {"type": ChatEventType.MESSAGE_DELETED.value, "id": message.id, "room_id": room_id}
+
+    emoji = request.get("emoji")
+    if not isinstance(emoji, str) or not emoji or len(emoji) > settings.MAX_EMOJI_LENGTH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid emoji")
+    delta = 1 if action == MessageAction.REACT else -1
+    count = ChatService.react_to_message(db, room_id, message_id, user_id, emoji, delta)
+    if count is None:
+        return None
+    message_history_cache.set_reaction(room_id, message_id, emoji, count)
+    return {
+        "type": ChatEventType.REACTION.value,
+        "id": message_id,
+        "room_id": room_id,
+        "emoji": emoji,
+        "count": count
+    }
+
+def post_message(db: Session, room_id: str, user: User, content: str, online_usernames: Set[str]) -> Dict[str, Any]:
+    """Persist a new message, add it to the room history and return its broadcast payload."""
+    new_message_db = ChatService.create_message(
+        db,
+        room_id=room_id,
+        user_id=user.id,
+        content=content,
+        sender_username=user.username,
+        online_usernames=online_usernames
+    )
+    broadcast_message = ChatService.serialize_message(new_message_db, user.username)
+    message_history_cache.append(room_id, dict(broadcast_message, reactions={}))
+    return broadcast_message
+
+def load_session_state(db: Session, room_id: str, user: User) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+    """
+    Resolve the connecting user's ID and the room replay (recent messages
+    oldest first, with edits and reactions applied).
+    """
+    # The token carries no user ID; authorship checks on edits and deletes need it
+    user_id = user.id
+    if user_id is None:
+        db_user = UserService.get_user_by_username(db, user.username)
+        user_id = db_user.id if db_user else None
+    history = message_history_cache.get(
+        room_id, lambda limit: ChatService.get_room_history(db, room_id=room_id, limit=limit)
+    )
+    return user_id, history
 
 # websocket endpoint for chat rooms
 @router.websocket("/ws/{room_id}")
@@ -62,58 +129,60 @@ async def websocket_endpoint(
     """
     WebSocket endpoint for chat communication.
     Requires a JWT token as a query parameter (e.g., /ws/general?token=YOUR_JWT_TOKEN).
+
+    Plain text frames are sent as new messages. JSON frames with an "action"
+    key edit, delete or react to a message, e.g.
+    {"action": "edit", "message_id": 1, "content": "..."},
+    {"action": "delete", "message_id": 1} or
+    {"action": "react" | "unreact", "message_id": 1, "emoji": "👍"}.
+
+    Database work runs on the room's shard when ROOM_SHARDS is set, and
+    broadcasts for a room go out in the order its messages were persisted.
     """
+    claims = getattr(websocket.state, "token_claims", {})
+    token_ids = [token_id for token_id in (claims.get("jti"), claims.get("sid")) if token_id]
+
     try:
-        await manager.connect(websocket, room_id)
-        
-
-        recent_messages = ChatService.get_recent_messages(db, room_id=room_id, limit=50) # Fetch 50 recent messages
-        
-        # Messages oldest first
-        for msg in reversed(recent_messages):
-            # Send message data. Exclude sensitive using model_dump for easy JSON conversion
-            await manager.send_personal_message(
-                json.dumps({
-                    "id": msg.id,
-                    "room_id": msg.room_id,
-                    "user_id": msg.user_id,
-                    "username": current_user.username, 
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat()
-                }),
-                websocket
-            )
+        await manager.connect(websocket, room_id, current_user.username, token_ids)
+
+        current_user.id, history = await room_shards.run(
+            room_id, lambda session: load_session_state(session, room_id, current_user), db
+        )
+        for message in history:
+            await manager.send_personal_message(json.dumps(message), websocket)
 
         while True:
             try:
                 data = await websocket.receive_text()
-                
-                new_message_db = ChatService.create_message(
-                    db,
-                    room_id=room_id,
-                    user_id=current_user.id,
-                    content=data
-                )
-                
-                # message for broadcasting 
-                broadcast_message = {
-                    "id": new_message_db.id,
-                    "room_id": new_message_db.room_id,
-                    "user_id": new_message_db.user_id,
-                    "username": current_user.username,
-                    "content": new_message_db.content,
-                    "timestamp": new_message_db.timestamp.isoformat()
-                }
-                
-                # Broadcast to all connected clients in the same room
-                await manager.broadcast(broadcast_message, room_id)
+                action_request = parse_message_action(data)
+
+                async with room_shards.sequencer.ordered(room_id) as wait_turn:
+                    if action_request is not None:
+                        event = await room_shards.run(
+                            room_id,
+                            lambda session: apply_message_action(session, room_id, current_user.id, action_request),
+                            db
+                        )
+                    else:
+                        # Snapshot on the event loop; the job may run on a shard thread
+                        online_usernames = set(manager.online_users)
+                        event = await room_shards.run(
+                            room_id,
+                            lambda session: post_message(session, room_id, current_user, data, online_usernames),
+                            db
+                        )
+                        outbox_worker.notify()
+
+                    # Broadcast to all connected clients in the same room
+                    if event is not None:
+                        await wait_turn()
+                        await manager.broadcast(event, room_id)
 
             except WebSocketDisconnect:
                 print(f"User {current_user.username} disconnected from room {room_id}.")
                 break # Exit the loop on disconnect
-            except json.JSONDecodeError:
-                print(f"Received invalid JSON from {current_user.username} in room {room_id}: {data}")
-                await websocket.send_text(json.dumps({"error": "Invalid JSON format"}))
+            except HTTPException as e:
+                await websocket.send_text(json.dumps({"error": e.detail}))
             except Exception as e:
                 print(f"Error in WebSocket communication for user {current_user.username} in room {room_id}: {e}")
                 await websocket.send_text(json.dumps({"error": f"Server error: {e}"}))
@@ -121,7 +190,7 @@ async def websocket_endpoint(
 
     finally:
         # Disconnection logic even if loop breaks due to other reasons
-        manager.disconnect(websocket, room_id)
+        manager.disconnect(websocket)
 
 # testing routes
 @router.get("/test")
@@ -1,38 +1,49 @@
 """
 User routes for user management.
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.models.user import User 
 from app.dependencies import get_current_user, require_role
+from app.utils.cache import cached_json_response, user_cache_key
 from app.utils.enums import UserRole
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/profile", response_model=User, response_model_exclude={'hashed_password'})
-def get_profile(current_user: User = Depends(get_current_user)):
+def get_profile(request: Request, current_user: User = Depends(get_current_user)):
     """
     Get current user profile.Accessible by authenticated users of any role.
+    Cached per user and served with an ETag.
     Args:
         current_user: Current authenticated user (SQLModel User instance)
     Returns:
         User profile information (hashed_password excluded from response)
     """
 
-    return current_user
+    return cached_json_response(
+        request,
+        user_cache_key(current_user.username, f"profile:{current_user.role.value}"),
+        lambda: current_user.model_dump(mode="json", exclude={"hashed_password"})
+    )
 
 @router.get("/dashboard")
-def user_dashboard(current_user: User = Depends(require_role(UserRole.USER))):
+def user_dashboard(request: Request, current_user: User = Depends(require_role(UserRole.USER))):
     """
     User dashboard endpoint. Accessible by users.
+    Cached per user and served with an ETag.
     Args:
         current_user: Current authenticated user (SQLModel User instance)
     Returns:
         Dashboard information
     """
     
-    return {
-        "message": "Welcome to user dashboard",
-        "user": current_user.username,
-        "role": current_user.role
-    }
+    return cached_json_response(
+        request,
+        user_cache_key(current_user.username, "dashboard"),
+        lambda: {
+            "message": "Welcome to user dashboard",
+            "user": current_user.username,
+            "role": current_user.role.value
+        }
+    )
 
@@ -1,12 +1,16 @@
 """
 Authentication service for login and token validation.
 """
-from typing import Optional
-from datetime import timedelta
+import uuid
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.services.revocation_index import revocation_index
 from app.services.user_service import UserService
-from app.utils.security import verify_password, create_access_token
+from app.utils.enums import TokenType
+from app.utils.security import verify_password, create_access_token, decode_token_claims
 from app.config import settings
 
 class AuthService:
@@ -33,19 +37,124 @@ class AuthService:
         return user
     
     @staticmethod
-    def create_access_token_for_user(user: User) -> str:
+    def create_access_token_for_user(user: User, session_id: Optional[str] = None) -> str:
         """
         Create access token for authenticated user.
         
         Args:
             user: Authenticated user
+            session_id: Login session the token belongs to (new session if omitted)
         
         Returns:
             JWT access token
         """
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.username, "role": user.role.value},
+            data={
+                "sub": user.username,
+                "role": user.role.value,
+                "type": TokenType.ACCESS.value,
+                "jti": uuid.uuid4().hex,
+                "sid": session_id or uuid.uuid4().hex,
+            },
             expires_delta=access_token_expires
         )
-        return access_token
\ No newline at end of file
+        return access_token
+
+    @staticmethod
+    def create_refresh_token_for_user(user: User, session_id: str) -> str:
+        """
+        Create a long-lived refresh token for a login session.
+
+        Args:
+            user: Authenticated user
+            session_id: Login session the token belongs to
+
+        Returns:
+            JWT refresh token
+        """
+        return create_access_token(
+            data={
+                "sub": user.username,
+                "type": TokenType.REFRESH.value,
+                "jti": uuid.uuid4().hex,
+                "sid": session_id,
+            },
+            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+
+    @staticmethod
+    def create_tokens_for_user(user: User, session_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        Issue an access/refresh token pair, starting a new session if none is given.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        return {
+            "access_token": AuthService.create_access_token_for_user(user, session_id),
+            "refresh_token": AuthService.create_refresh_token_for_user(user, session_id),
+            "token_type": "bearer",
+        }
+
+    @staticmethod
+    def _session_expiry() -> datetime:
+        # After a session is revoked no token can be refreshed, so every token
+        # in it has expired by the time the newest possible refresh token has.
+        return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+    @staticmethod
+    def refresh_tokens(db: Session, refresh_token: str) -> Dict[str, str]:
+        """
+        Rotate a refresh token: revoke it and issue a new token pair.
+
+        No password check is involved, so steady-state clients avoid bcrypt
+        entirely. Presenting an already-used refresh token means it leaked,
+        so the whole session is revoked.
+
+        Args:
+            db: Database session
+            refresh_token: Refresh token issued at login or by a previous refresh
+
+        Returns:
+            New access token, refresh token and token type
+
+        Raises:
+            HTTPException: If the token is invalid, expired or revoked
+        """
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        claims = decode_token_claims(refresh_token)
+        jti, session_id = claims.get("jti"), claims.get("sid")
+        if claims.get("type") != TokenType.REFRESH.value or not jti or not session_id:
+            raise credentials_exception
+        # Checked in the database, not the synced index, so a revocation or
+        # rotation on another worker takes effect immediately
+        if revocation_index.is_revoked_in_db(db, session_id):
+            raise credentials_exception
+
+        user = UserService.get_user_by_username(db, claims.get("sub"))
+        if not user:
+            raise credentials_exception
+
+        # Only one caller can claim the jti; anyone else is reusing the token
+        if not revocation_index.claim(db, jti, datetime.fromtimestamp(claims["exp"], timezone.utc)):
+            revocation_index.revoke(db, [session_id], AuthService._session_expiry())
+            raise credentials_exception
+        return AuthService.create_tokens_for_user(user, session_id)
+
+    @staticmethod
+    def revoke_session(db: Session, claims: Dict[str, Any]) -> None:
+        """
+        Revoke the session a token belongs to, invalidating every access and
+        refresh token issued for it and closing its WebSockets.
+
+        Tokens issued before sessions existed carry no ``sid``; only the token
+        itself is revoked then.
+        """
+        session_id = claims.get("sid")
+        if session_id:
+            revocation_index.revoke(db, [session_id], AuthService._session_expiry())
+        elif claims.get("jti"):
+            revocation_index.revoke(db, [claims["jti"]], datetime.fromtimestamp(claims["exp"], timezone.utc))
\ No newline at end of file
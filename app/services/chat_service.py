@@ -1,7 +1,13 @@
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Optional, List, Collection, Dict, Any
+from fastapi import HTTPException, status
 from sqlmodel import Session, select
-from app.models.message import Message
+from app.models.message import Message, MessageReaction
+from app.models.user import User
+from app.config import settings
+from app.services.notification_service import NotificationService
+from app.services.reaction_aggregator import reaction_aggregator
+from app.utils.enums import ChatEventType
 
 class ChatService:
     """
@@ -22,7 +28,9 @@ class ChatService:
         db: Session,
         room_id: str,
         user_id: int,
-        content: str
+        content: str,
+        sender_username: Optional[str] = None,
+        online_usernames: Optional[Collection[str]] = None
     ) -> Message:
         """
         Create a new message in a chat room.
@@ -32,6 +40,10 @@ class ChatService:
             room_id: ID of the chat room
             user_id: ID of the user sending the message
             content: Content of the message
+            sender_username: Username of the sender, excluded from notifications
+            online_usernames: Usernames currently connected. When given, mentioned
+                and direct-message recipients not in it get outbox entries,
+                committed together with the message.
 
         Returns:
             The created Message object.
@@ -43,6 +55,15 @@ class ChatService:
             timestamp=datetime.now(timezone.utc)
         )
         db.add(message)
+
+        # Nothing drains the outbox while it's disabled, so don't fill it
+        if online_usernames is not None and settings.OUTBOX_ENABLED:
+            offline = NotificationService.get_recipients(room_id, content, sender_username) - set(online_usernames)
+            offline = NotificationService.existing_usernames(db, offline)
+            if offline:
+                db.flush()  # Assigns message.id for the outbox foreign key
+                NotificationService.enqueue(db, message, offline)
+
         db.commit()
         db.refresh(message)
         return message
@@ -72,5 +93,124 @@ class ChatService:
     def get_message_by_id(db: Session, message_id: int) -> Optional[Message]:
         """Fetches a message by its ID."""
         return db.exec(select(Message).where(Message.id == message_id)).first()
-        
-        
\ No newline at end of file
+
+    @staticmethod
+    def serialize_message(
+        message: Message,
+        username: Optional[str],
+        reactions: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Build the WebSocket payload for a message."""
+        return {
+            "type": ChatEventType.MESSAGE.value,
+            "id": message.id,
+            "room_id": message.room_id,
+            "user_id": message.user_id,
+            "username": username,
+            "content": message.content,
+            "timestamp": message.timestamp.isoformat(),
+            "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+            "reactions": dict(reactions or {}),
+        }
+
+    @staticmethod
+    def get_reaction_counts(db: Session, message_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """Fetches reaction counts for several messages in one query, including unflushed ones."""
+        reactions: Dict[int, Dict[str, int]] = {message_id: {} for message_id in message_ids}
+        if message_ids:
+            rows = db.exec(
+                select(MessageReaction).where(
+                    MessageReaction.message_id.in_(message_ids),
+                    MessageReaction.count > 0
+                )
+            ).all()
+            for row in rows:
+                reactions[row.message_id][row.emoji] = row.count
+        return reaction_aggregator.overlay(reactions, message_ids)
+
+    @staticmethod
+    def get_room_history(db: Session, room_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Build the replay for a room: recent non-deleted messages, oldest first,
+        with sender usernames, edits and reaction counts folded in.
+
+        Uses one query for messages and usernames and one for reactions,
+        regardless of the number of messages.
+        """
+        rows = db.exec(
+            select(Message, User.username)
+            .outerjoin(User, User.id == Message.user_id)
+            .where(Message.room_id == room_id, Message.deleted == False)  # noqa: E712
+            .order_by(Message.timestamp.desc())
+            .limit(limit)
+        ).all()
+        reactions = ChatService.get_reaction_counts(db, [message.id for message, _ in rows])
+        return [
+            ChatService.serialize_message(message, username, reactions[message.id])
+            for message, username in reversed(rows)
+        ]
+
+    @staticmethod
+    def get_room_message(db: Session, room_id: str, message_id: int) -> Message:
+        """
+        Fetches a live message in a room.
+
+        Raises:
+            HTTPException: If the message does not exist, is in another room or was deleted
+        """
+        message = db.get(Message, message_id)
+        if not message or message.room_id != room_id or message.deleted:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+        return message
+
+    @staticmethod
+    def edit_message(db: Session, room_id: str, message_id: int, user_id: int, content: str) -> Message:
+        """
+        Edit the content of a message. Only its author may edit it.
+
+        Raises:
+            HTTPException: If the message is not found or the user is not its author
+        """
+        message = ChatService.get_room_message(db, room_id, message_id)
+        if message.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted")
+        message.content = content
+        message.edited_at = datetime.now(timezone.utc)
+        db.add(message)
+        db.commit()
+        db.refresh(message)
+        return message
+
+    @staticmethod
+    def delete_message(db: Session, room_id: str, message_id: int, user_id: int) -> Message:
+        """
+        Soft-delete a message, clearing its content. Only its author may delete it.
+
+        Raises:
+            HTTPException: If the message is not found or the user is not its author
+        """
+        message = ChatService.get_room_message(db, room_id, message_id)
+        if message.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted")
+        message.content = ""
+        message.deleted = True
+        db.add(message)
+        db.commit()
+        db.refresh(message)
+        reaction_aggregator.forget([message.id])
+        return message
+
+    @staticmethod
+    def react_to_message(db: Session, room_id: str, message_id: int, user_id: Optional[int], emoji: str, delta: int) -> Optional[int]:
+        """
+        Add (+1) or remove (-1) the user's reaction. Counted in memory and
+        flushed to the database in batches; returns the new count, or None
+        if the user had already reacted (or had nothing to remove).
+
+        Raises:
+            HTTPException: If the message is not found or the user is unknown
+        """
+        if user_id is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted")
+        ChatService.get_room_message(db, room_id, message_id)
+        return reaction_aggregator.add(db, message_id, emoji, user_id, delta)
@@ -0,0 +1,140 @@
+"""
+Registry of open chat WebSockets, by room, user and token.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import WebSocket, status
+from app.config import settings
+
+class ConnectionManager:
+    """
+    Tracks open chat WebSockets and fans messages out to rooms.
+
+    Everything runs on the event loop. State is only mutated between
+    awaits, broadcasts iterate over a snapshot of the room, and
+    ``disconnect`` is idempotent, so sockets may join or leave (or be
+    dropped after a failed send) while other sends are in flight. Dropped
+    sockets are also closed, so their handlers stop instead of lingering
+    connected but unregistered.
+    """
+
+    def __init__(self, send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS, verbose: bool = True):
+        # Dicts are used as insertion-ordered sets so leaving a room is O(1)
+        self.active_connections: Dict[str, Dict[WebSocket, None]] = {}
+        self.online_users: Dict[str, int] = {} # username -> number of open sockets
+        self.token_connections: Dict[str, Dict[WebSocket, None]] = {} # token ID / session ID -> sockets
+        self.connection_info: Dict[WebSocket, Tuple[str, Optional[str], Tuple[str, ...]]] = {} # socket -> (room_id, username, token_ids)
+        self.send_timeout = send_timeout
+        self.verbose = verbose # Log connects, disconnects and send errors
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Future] = set() # Pending closes of dropped or revoked sockets
+
+    async def connect(self, websocket: WebSocket, room_id: str, username: Optional[str] = None, token_ids: Iterable[str] = ()):
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        if websocket in self.connection_info:
+            return
+        token_ids = tuple(token_ids)
+        self.connection_info[websocket] = (room_id, username, token_ids)
+        self.active_connections.setdefault(room_id, {})[websocket] = None
+        for token_id in token_ids:
+            self.token_connections.setdefault(token_id, {})[websocket] = None
+        if username is not None:
+            self.online_users[username] = self.online_users.get(username, 0) + 1
+        if self.verbose:
+            print(f"User connected to room {room_id}. Total connections in room: {len(self.active_connections[room_id])}")
+
+    def disconnect(self, websocket: WebSocket):
+        """Forget a socket. Safe to call more than once, or for a socket that never connected."""
+        info = self.connection_info.pop(websocket, None)
+        if info is None:
+            return
+        room_id, username, token_ids = info
+
+        room = self.active_connections.get(room_id)
+        if room is not None:
+            room.pop(websocket, None)
+            if not room:
+                del self.active_connections[room_id] # Clean up empty rooms
+        for token_id in token_ids:
+            sockets = self.token_connections.get(token_id)
+            if sockets is not None:
+                sockets.pop(websocket, None)
+                if not sockets:
+                    del self.token_connections[token_id]
+        if username is not None and username in self.online_users:
+            self.online_users[username] -= 1
+            if self.online_users[username] <= 0:
+                del self.online_users[username]
+        if self.verbose:
+            print(f"User disconnected from room {room_id}. Remaining connections in room: {len(self.active_connections.get(room_id, ()))}")
+
+    def close_revoked(self, token_ids: List[str]):
+        """
+        Revocation listener: close sockets authenticated by a revoked token or session.
+        May be called from any thread; the sockets are closed on the event loop.
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._track_close, self._close_token_connections(token_ids))
+
+    def _track_close(self, close: Awaitable[None]):
+        # Keep a reference so the task isn't collected, and so wait_closed sees it
+        task = asyncio.ensure_future(close)
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket, code: int, reason: str):
+        try:
+            await asyncio.wait_for(websocket.close(code=code, reason=reason), timeout=self.send_timeout)
+        except Exception as e:
+            if self.verbose:
+                print(f"Error closing WebSocket ({reason}): {e!r}")
+
+    async def wait_closed(self):
+        """Wait for closes scheduled for dropped or revoked sockets to finish."""
+        while self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    async def _close_token_connections(self, token_ids: List[str]):
+        # Ordered, so closes happen in connection order rather than by object address
+        sockets = dict.fromkeys(ws for token_id in token_ids for ws in list(self.token_connections.get(token_id, ())))
+        for websocket in sockets:
+            await self._close(websocket, status.WS_1008_POLICY_VIOLATION, "Token revoked")
+            self.disconnect(websocket)
+        if sockets and self.verbose:
+            print(f"Closed {len(sockets)} WebSocket(s) for revoked tokens.")
+
+    async def send_personal_message(self, message: str, websocket: WebSocket):
+        await websocket.send_text(message)
+
+    async def _send(self, websocket: WebSocket, message: str):
+        await asyncio.wait_for(websocket.send_text(message), timeout=self.send_timeout)
+
+    async def broadcast(self, message: Dict[str, Any], room_id: str):
+        """
+        Broadcasts a message (as JSON string) to all clients in a specific room.
+
+        Sends run concurrently, so one slow client doesn't hold up the rest.
+        Clients whose send fails or times out are disconnected and closed in
+        the background.
+        """
+        # Ensure the message is JSON serializable
+        message_str = json.dumps(message, default=str) # default=str handles datetime serialization
+
+        # Snapshot: the room may change while sends are awaited
+        connections = list(self.active_connections.get(room_id, ()))
+        if not connections:
+            return
+        results = await asyncio.gather(
+            *(self._send(connection, message_str) for connection in connections),
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                if self.verbose:
+                    print(f"Error sending to WebSocket in room {room_id}: {result!r}")
+                if connection in self.connection_info:
+                    self.disconnect(connection)
+                    self._track_close(self._close(connection, status.WS_1011_INTERNAL_ERROR, "Send failed or timed out"))
@@ -0,0 +1,103 @@
+"""
+Per-room cache of recent chat history with mutations folded in.
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from app.config import settings
+from app.utils.cache import TTLCache
+
+class RoomHistory:
+    """Recent messages of one room, oldest first, with an index by message ID."""
+
+    def __init__(self, messages: List[Dict[str, Any]], limit: int):
+        self.limit = limit
+        self.messages = messages[-limit:]
+        self.by_id = {message["id"]: message for message in self.messages}
+
+
+class MessageHistoryCache:
+    """
+    Caches the replay sent to clients joining a room.
+
+    Entries are serialized message dicts kept up to date in place as
+    messages are created, edited, deleted and reacted to, so a join is
+    served without touching the database. Deleted messages are dropped
+    from the replay. Rooms fall out by LRU/TTL and are rebuilt from the
+    database on the next join.
+    """
+
+    def __init__(
+        self,
+        limit: int = settings.CHAT_HISTORY_LIMIT,
+        max_rooms: int = settings.CHAT_HISTORY_CACHE_ROOMS,
+        ttl: float = settings.CHAT_HISTORY_CACHE_TTL_SECONDS
+    ):
+        self.limit = limit
+        self._rooms = TTLCache(maxsize=max_rooms, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, room_id: str, load: Callable[[int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Return a snapshot of the room's recent messages, oldest first.
+
+        Args:
+            room_id: Room to replay
+            load: Builds the history from the database on a miss, given the limit
+        """
+        history = self._rooms.get(room_id)
+        if history is None:
+            history = RoomHistory(load(self.limit), self.limit)
+            self._rooms.set(room_id, history)
+        with self._lock:
+            return [dict(message, reactions=dict(message["reactions"])) for message in history.messages]
+
+    def append(self, room_id: str, message: Dict[str, Any]) -> None:
+        history = self._rooms.get(room_id)
+        if history is None:
+            return  # Built from the database on the next join
+        with self._lock:
+            history.messages.append(message)
+            history.by_id[message["id"]] = message
+            while len(history.messages) > history.limit:
+                del history.by_id[history.messages.pop(0)["id"]]
+
+    def update(self, room_id: str, message_id: int, **changes: Any) -> None:
+        """Apply field changes to a cached message, if it is cached."""
+        history = self._rooms.get(room_id)
+        if history is None:
+            return
+        with self._lock:
+            message = history.by_id.get(message_id)
+            if message is not None:
+                message.update(changes)
+
+    def remove(self, room_id: str, message_id: int) -> None:
+        history = self._rooms.get(room_id)
+        if history is None:
+            return
+        with self._lock:
+            message = history.by_id.pop(message_id, None)
+            if message is not None:
+                history.messages.remove(message)
+
+    def set_reaction(self, room_id: str, message_id: int, emoji: str, count: int) -> None:
+        history = self._rooms.get(room_id)
+        if history is None:
+            return
+        with self._lock:
+            message = history.by_id.get(message_id)
+            if message is None:
+                return
+            if count:
+                message["reactions"][emoji] = count
+            else:
+                message["reactions"].pop(emoji, None)
+
+    def invalidate(self, room_id: Optional[str] = None) -> None:
+        if room_id is None:
+            self._rooms.clear()
+        else:
+            self._rooms.invalidate(room_id)
+
+
+message_history_cache = MessageHistoryCache()
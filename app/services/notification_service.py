@@ -0,0 +1,165 @@
+"""
+Notification service for the offline delivery outbox.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Set, Iterable, Dict, Any
+from sqlmodel import Session, select, delete, or_
+from app.models.message import Message
+from app.models.notification import OutboxEntry
+from app.models.user import User
+from app.utils.enums import OutboxStatus
+from app.config import settings
+
+MENTION_PATTERN = re.compile(r"(?<![\w@])@(\w+)")
+DIRECT_ROOM_PREFIX = "dm:"
+
+class NotificationService:
+    """
+    Service class for notification outbox operations.
+    """
+
+    @staticmethod
+    def get_recipients(room_id: str, content: str, sender_username: Optional[str] = None) -> Set[str]:
+        """
+        Resolve the usernames a message should notify.
+
+        Recipients are users mentioned as ``@username`` in the content, plus the
+        participants of a direct-message room (``dm:alice:bob``). The sender is
+        never notified about their own message.
+        """
+        recipients = set(MENTION_PATTERN.findall(content))
+        if room_id.startswith(DIRECT_ROOM_PREFIX):
+            recipients.update(name for name in room_id[len(DIRECT_ROOM_PREFIX):].split(":") if name)
+        recipients.discard(sender_username)
+        return recipients
+
+    @staticmethod
+    def existing_usernames(db: Session, usernames: Iterable[str]) -> Set[str]:
+        """
+        Keep only usernames that belong to registered users, in one query,
+        so mentions of unknown names don't become outbox entries.
+        """
+        usernames = set(usernames)
+        if not usernames:
+            return set()
+        return set(db.exec(select(User.username).where(User.username.in_(usernames))).all())
+
+    @staticmethod
+    def enqueue(db: Session, message: Message, recipients: Iterable[str]) -> List[OutboxEntry]:
+        """
+        Add outbox entries for a message to the session without committing,
+        so they are persisted in the same transaction as the message itself.
+        """
+        entries = [OutboxEntry(message_id=message.id, recipient=recipient) for recipient in sorted(recipients)]
+        db.add_all(entries)
+        return entries
+
+    @staticmethod
+    def claim_batch(db: Session, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Lease up to ``limit`` due outbox entries for delivery.
+
+        Claimed entries are marked in flight until the lease expires, so a
+        crashed worker's entries become due again instead of being lost.
+
+        Returns:
+            Plain delivery payloads, safe to use after the session is closed.
+        """
+        now = datetime.now(timezone.utc)
+        query = (
+            select(OutboxEntry, Message)
+            .join(Message, Message.id == OutboxEntry.message_id)
+            .where(
+                or_(
+                    OutboxEntry.status == OutboxStatus.PENDING,
+                    OutboxEntry.status == OutboxStatus.IN_FLIGHT,
+                ),
+                OutboxEntry.next_attempt_at <= now,
+            )
+            .order_by(OutboxEntry.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=OutboxEntry)
+        )
+        rows = db.exec(query).all()
+
+        lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        payloads = []
+        for entry, message in rows:
+            entry.status = OutboxStatus.IN_FLIGHT
+            entry.attempts += 1
+            entry.next_attempt_at = lease_until
+            db.add(entry)
+            payloads.append({
+                "outbox_id": entry.id,
+                "attempt": entry.attempts,
+                "recipient": entry.recipient,
+                "message": {
+                    "id": message.id,
+                    "room_id": message.room_id,
+                    "user_id": message.user_id,
+                    "content": message.content,
+                    "timestamp": message.timestamp.isoformat(),
+                },
+            })
+        db.commit()
+        return payloads
+
+    @staticmethod
+    def mark_delivered(db: Session, outbox_ids: List[int]) -> None:
+        """Mark a batch of outbox entries as delivered."""
+        if not outbox_ids:
+            return
+        entries = db.exec(select(OutboxEntry).where(OutboxEntry.id.in_(outbox_ids))).all()
+        for entry in entries:
+            entry.status = OutboxStatus.DELIVERED
+            entry.last_error = None
+            db.add(entry)
+        db.commit()
+
+    @staticmethod
+    def purge_finished(db: Session, older_than: datetime) -> int:
+        """
+        Delete delivered and failed entries created before ``older_than``.
+
+        Returns:
+            Number of entries deleted.
+        """
+        result = db.execute(
+            delete(OutboxEntry).where(
+                or_(OutboxEntry.status == OutboxStatus.DELIVERED, OutboxEntry.status == OutboxStatus.FAILED),
+                OutboxEntry.created_at < older_than,
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def mark_failed(db: Session, failures: Dict[int, str]) -> None:
+        """
+        Record failed deliveries and schedule retries with exponential backoff.
+
+        Args:
+            db: Database session
+            failures: Mapping of outbox entry ID to error description
+
+        Entries that have used up ``OUTBOX_MAX_ATTEMPTS`` are marked failed for good.
+        """
+        if not failures:
+            return
+        now = datetime.now(timezone.utc)
+        entries = db.exec(select(OutboxEntry).where(OutboxEntry.id.in_(list(failures)))).all()
+        for entry in entries:
+            entry.last_error = failures[entry.id][:500]
+            if entry.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                entry.status = OutboxStatus.FAILED
+            else:
+                delay = min(
+                    settings.OUTBOX_BACKOFF_BASE_SECONDS * (2 ** (entry.attempts - 1)),
+                    settings.OUTBOX_BACKOFF_MAX_SECONDS,
+                )
+                entry.status = OutboxStatus.PENDING
+                entry.next_attempt_at = now + timedelta(seconds=delay)
+            db.add(entry)
+        db.commit()
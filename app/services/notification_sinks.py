@@ -0,0 +1,118 @@
+"""
+Delivery sinks used by the outbox worker to hand notifications off.
+"""
+import asyncio
+import json
+from typing import List, Dict, Any, Optional
+from app.config import settings
+
+class DeliveryError(Exception):
+    """Raised by a sink when a notification could not be delivered."""
+
+
+class DeliverySink:
+    """
+    Base class for notification delivery targets.
+
+    ``deliver_batch`` receives outbox payloads and returns a mapping of
+    outbox ID to error message for every payload that failed; payloads not
+    in the mapping are considered delivered.
+    """
+
+    async def deliver_batch(self, payloads: List[Dict[str, Any]]) -> Dict[int, str]:
+        failures: Dict[int, str] = {}
+        for payload in payloads:
+            try:
+                await self.deliver(payload)
+            except Exception as e:
+                failures[payload["outbox_id"]] = str(e) or e.__class__.__name__
+        return failures
+
+    async def deliver(self, payload: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class WebhookSink(DeliverySink):
+    """POSTs each notification as JSON to a webhook URL."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise DeliveryError(f"Webhook responded with HTTP {response.status}")
+
+    async def deliver(self, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        # urllib is blocking; keep it off the event loop
+        await asyncio.to_thread(self._post, body)
+
+
+class FileSink(DeliverySink):
+    """Appends notifications to a newline-delimited JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    def _write(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def deliver_batch(self, payloads: List[Dict[str, Any]]) -> Dict[int, str]:
+        lines = [json.dumps(payload, default=str) + "\n" for payload in payloads]
+        try:
+            async with self._lock:
+                await asyncio.to_thread(self._write, lines)
+        except OSError as e:
+            return {payload["outbox_id"]: str(e) for payload in payloads}
+        return {}
+
+    async def deliver(self, payload: Dict[str, Any]) -> None:
+        failures = await self.deliver_batch([payload])
+        if failures:
+            raise DeliveryError(failures[payload["outbox_id"]])
+
+
+class QueueSink(DeliverySink):
+    """Puts notifications on an asyncio queue; an in-process stand-in for tests."""
+
+    def __init__(self, queue: Optional[asyncio.Queue] = None):
+        self.queue = queue if queue is not None else asyncio.Queue()
+
+    async def deliver(self, payload: Dict[str, Any]) -> None:
+        await self.queue.put(payload)
+
+
+def build_delivery_sink() -> DeliverySink:
+    """
+    Build the delivery sink configured by ``OUTBOX_SINK``.
+
+    Raises:
+        ValueError: If no sink is configured, the sink name is unknown or
+            the webhook URL is missing
+    """
+    if not settings.OUTBOX_SINK:
+        raise ValueError("OUTBOX_SINK must be set when the outbox is enabled ('webhook', or 'file'/'queue' for testing)")
+    if settings.OUTBOX_SINK == "webhook":
+        if not settings.OUTBOX_WEBHOOK_URL:
+            raise ValueError("OUTBOX_WEBHOOK_URL must be set when OUTBOX_SINK is 'webhook'")
+        return WebhookSink(settings.OUTBOX_WEBHOOK_URL, timeout=settings.OUTBOX_WEBHOOK_TIMEOUT_SECONDS)
+    if settings.OUTBOX_SINK == "file":
+        return FileSink(settings.OUTBOX_FILE_PATH)
+    if settings.OUTBOX_SINK == "queue":
+        return QueueSink()
+    raise ValueError(f"Unknown OUTBOX_SINK: {settings.OUTBOX_SINK}")
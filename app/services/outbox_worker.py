@@ -0,0 +1,136 @@
+"""
+Background worker pool that drains the notification outbox.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from sqlmodel import Session
+from app.config import settings
+from app.database import engine
+from app.services.notification_service import NotificationService
+from app.services.notification_sinks import DeliverySink, build_delivery_sink
+
+class OutboxWorker:
+    """
+    Drains due outbox entries in batches and hands them to a delivery sink.
+
+    A single poller claims batches from the database and feeds them to a
+    pool of delivery tasks through a bounded queue. Database calls run in a
+    thread so the event loop serving WebSockets is never blocked on them.
+    The poller also deletes finished entries older than
+    ``OUTBOX_RETENTION_HOURS`` every ``OUTBOX_PURGE_INTERVAL_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[DeliverySink] = None,
+        workers: int = settings.OUTBOX_WORKERS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        retention: timedelta = timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+        purge_interval: float = settings.OUTBOX_PURGE_INTERVAL_SECONDS,
+    ):
+        self.sink = sink
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._wakeup = asyncio.Event()
+        self._batches: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def notify(self) -> None:
+        """Wake the poller early; called after new outbox entries are committed."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        if self.sink is None:
+            self.sink = build_delivery_sink()
+        self._wakeup = asyncio.Event()
+        self._batches = asyncio.Queue(maxsize=self.workers * 2)
+        self._tasks = [asyncio.create_task(self._poll(), name="outbox-poller")]
+        self._tasks += [
+            asyncio.create_task(self._deliver(), name=f"outbox-worker-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"Outbox worker started with {self.workers} delivery tasks.")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.sink is not None:
+            await self.sink.close()
+        # Claimed but undelivered entries are picked up again once their lease expires
+        print("Outbox worker stopped.")
+
+    @staticmethod
+    def _claim(limit: int) -> List[Dict[str, Any]]:
+        with Session(engine) as db:
+            return NotificationService.claim_batch(db, limit=limit)
+
+    @staticmethod
+    def _record(delivered: List[int], failures: Dict[int, str]) -> None:
+        with Session(engine) as db:
+            NotificationService.mark_delivered(db, delivered)
+            NotificationService.mark_failed(db, failures)
+
+    def _purge(self) -> int:
+        with Session(engine) as db:
+            return NotificationService.purge_finished(db, datetime.now(timezone.utc) - self.retention)
+
+    async def _poll(self) -> None:
+        next_purge = time.monotonic()
+        while True:
+            if time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + self.purge_interval
+                try:
+                    purged = await asyncio.to_thread(self._purge)
+                    if purged:
+                        print(f"Purged {purged} finished outbox entries.")
+                except Exception as e:
+                    print(f"Error purging outbox entries: {e}")
+
+            try:
+                batch = await asyncio.to_thread(self._claim, self.batch_size)
+            except Exception as e:
+                print(f"Error claiming outbox entries: {e}")
+                batch = []
+
+            if batch:
+                await self._batches.put(batch)
+                if len(batch) == self.batch_size:
+                    continue  # Backlog; keep draining without waiting
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _deliver(self) -> None:
+        while True:
+            batch = await self._batches.get()
+            try:
+                try:
+                    failures = await self.sink.deliver_batch(batch)
+                except Exception as e:
+                    failures = {payload["outbox_id"]: str(e) for payload in batch}
+                delivered = [payload["outbox_id"] for payload in batch if payload["outbox_id"] not in failures]
+                await asyncio.to_thread(self._record, delivered, failures)
+            except Exception as e:
+                print(f"Error recording outbox delivery results: {e}")
+            finally:
+                self._batches.task_done()
+
+
+outbox_worker = OutboxWorker()
@@ -0,0 +1,181 @@
+"""
+In-memory reaction counters flushed to the database in batches.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlmodel import Session, select
+from app.config import settings
+from app.database import engine
+from app.models.message import MessageReaction
+from app.utils.cache import TTLCache
+
+ReactionKey = Tuple[int, str]  # (message_id, emoji)
+
+class MessageReactions:
+    """Live reaction state of one message: counts, and who reacted with what."""
+
+    def __init__(self, counts: Dict[str, int]):
+        self.counts = counts
+        self.users: Dict[str, Set[int]] = {}  # emoji -> IDs of users who reacted
+
+class ReactionAggregator:
+    """
+    Keeps reaction counts in memory and writes them out periodically.
+
+    A reaction click only updates a counter; the accumulated deltas are
+    written in one transaction every ``REACTION_FLUSH_SECONDS`` (and on
+    shutdown), so a burst of clicks on a hot message costs one row write.
+
+    Live state for a message is loaded the first time it is reacted to and
+    kept in an LRU/TTL cache, so messages nobody reacts to any more fall
+    out. A reloaded message gets its counts from the database plus any
+    unflushed deltas. Who reacted is only tracked in memory, so a user can
+    react once per emoji and only remove their own reaction, as long as the
+    message stays cached.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.REACTION_FLUSH_SECONDS,
+        max_messages: int = settings.REACTION_CACHE_MESSAGES,
+        ttl: float = settings.REACTION_CACHE_TTL_SECONDS
+    ):
+        self.flush_interval = flush_interval
+        self._states = TTLCache(maxsize=max_messages, ttl=ttl)
+        self._pending: Dict[ReactionKey, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        # Held while a flush writes, so a reload never sees deltas in neither place
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_loaded(self, db: Session, message_id: int) -> MessageReactions:
+        state = self._states.get(message_id)
+        if state is None:
+            with self._flush_lock:
+                state = self._states.get(message_id)
+                if state is None:
+                    rows = db.exec(select(MessageReaction).where(MessageReaction.message_id == message_id)).all()
+                    counts = {row.emoji: row.count for row in rows}
+                    with self._lock:
+                        for (pending_id, emoji), delta in self._pending.items():
+                            if pending_id == message_id:
+                                counts[emoji] = max(0, counts.get(emoji, 0) + delta)
+                    state = MessageReactions({emoji: count for emoji, count in counts.items() if count > 0})
+                    self._states.set(message_id, state)
+        return state
+
+    def add(self, db: Session, message_id: int, emoji: str, user_id: int, delta: int) -> Optional[int]:
+        """
+        Add (+1) or remove (-1) a user's reaction and return the new count,
+        or None if nothing changed (already reacted, or nothing to remove).
+        """
+        state = self._ensure_loaded(db, message_id)
+        with self._lock:
+            users = state.users.get(emoji, set())
+            if (delta > 0) == (user_id in users):
+                return None
+            current = state.counts.get(emoji, 0)
+            new_count = max(0, current + delta)
+            if delta > 0:
+                state.users.setdefault(emoji, users).add(user_id)
+            else:
+                users.discard(user_id)
+                if not users:
+                    state.users.pop(emoji, None)
+            if new_count:
+                state.counts[emoji] = new_count
+            else:
+                state.counts.pop(emoji, None)
+            self._pending[(message_id, emoji)] += new_count - current
+        return new_count
+
+    def overlay(self, reactions: Dict[int, Dict[str, int]], message_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Replace database counts with live in-memory totals where present,
+        and add unflushed deltas for messages no longer cached, so history
+        built from the database includes unflushed reactions.
+        """
+        uncached = set()
+        for message_id in message_ids:
+            state = self._states.get(message_id)
+            if state is not None:
+                with self._lock:
+                    reactions[message_id] = dict(state.counts)
+            else:
+                uncached.add(message_id)
+        with self._lock:
+            for (message_id, emoji), delta in self._pending.items():
+                if message_id in uncached and delta:
+                    counts = reactions.setdefault(message_id, {})
+                    count = max(0, counts.get(emoji, 0) + delta)
+                    if count:
+                        counts[emoji] = count
+                    else:
+                        counts.pop(emoji, None)
+        return reactions
+
+    def forget(self, message_ids: Iterable[int]) -> None:
+        """Drop in-memory state, e.g. for deleted messages. Pending deltas are kept."""
+        for message_id in message_ids:
+            self._states.invalidate(message_id)
+
+    def flush(self, db: Session) -> int:
+        """
+        Write pending deltas to the database in one transaction.
+
+        Returns:
+            Number of (message, emoji) counters written.
+        """
+        with self._flush_lock:
+            return self._flush(db)
+
+    def _flush(self, db: Session) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        pending = {key: delta for key, delta in pending.items() if delta}
+        if not pending:
+            return 0
+        try:
+            for (message_id, emoji), delta in pending.items():
+                row = db.get(MessageReaction, (message_id, emoji))
+                if row is None:
+                    row = MessageReaction(message_id=message_id, emoji=emoji, count=0)
+                row.count = max(0, row.count + delta)
+                db.add(row)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] += delta
+            raise
+        return len(pending)
+
+    def _flush_with_new_session(self) -> int:
+        with Session(engine) as db:
+            return self.flush(db)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="reaction-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self._flush_with_new_session)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self._flush_with_new_session)
+            except Exception as e:
+                print(f"Error flushing reactions: {e}")
+
+
+reaction_aggregator = ReactionAggregator()
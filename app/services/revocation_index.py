@@ -0,0 +1,166 @@
+"""
+In-memory index of revoked token and session IDs, backed by the database.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, delete
+from app.config import settings
+from app.database import engine
+from app.models.token import RevokedToken, UsedRefreshToken
+
+def _epoch(value: datetime) -> float:
+    # SQLite hands back naive datetimes; everything is stored as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class RevocationIndex:
+    """
+    Set of revoked IDs checked on every authenticated request.
+
+    Lookups are a dict membership test, so they add no database work to the
+    request path. Paths that must not act on a stale view, like refresh
+    token rotation, use ``is_revoked_in_db`` and ``claim`` instead. Revocations are written to ``revoked_tokens`` and each
+    worker reloads new rows periodically, so a revocation made on one worker
+    reaches the others within ``REVOCATION_SYNC_SECONDS``. Entries are
+    dropped once the tokens they cover have expired, keeping the index small.
+
+    Listeners are called with newly revoked IDs, possibly from a worker
+    thread, and must be thread-safe.
+    """
+
+    def __init__(self, sync_interval: float = settings.REVOCATION_SYNC_SECONDS):
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}  # ID -> expiry (epoch seconds)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        return any(token_id in self._revoked for token_id in token_ids if token_id)
+
+    def add_listener(self, listener: Callable[[List[str]], None]) -> None:
+        self._listeners.append(listener)
+
+    def _add(self, entries: Dict[str, float]) -> None:
+        with self._lock:
+            new_ids = [token_id for token_id in entries if token_id not in self._revoked]
+            self._revoked.update(entries)
+        if new_ids:
+            for listener in self._listeners:
+                try:
+                    listener(new_ids)
+                except Exception as e:
+                    print(f"Error notifying revocation listener: {e}")
+
+    def revoke(self, db: Session, token_ids: Iterable[str], expires_at: datetime) -> None:
+        """
+        Revoke IDs until ``expires_at``, the latest expiry of any token carrying them.
+        """
+        token_ids = [token_id for token_id in token_ids if token_id]
+        for token_id in token_ids:
+            db.merge(RevokedToken(token_id=token_id, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Revoked concurrently elsewhere; the rows exist now, so merge updates them
+            db.rollback()
+            for token_id in token_ids:
+                db.merge(RevokedToken(token_id=token_id, expires_at=expires_at))
+            db.commit()
+        self._add({token_id: _epoch(expires_at) for token_id in token_ids})
+
+    def is_revoked_in_db(self, db: Session, token_id: str) -> bool:
+        """Check the database directly, seeing revocations other workers haven't synced yet."""
+        return db.get(RevokedToken, token_id) is not None
+
+    def claim(self, db: Session, token_id: str, expires_at: datetime) -> bool:
+        """
+        Atomically mark a single-use refresh token ID as used.
+
+        The insert either creates the row or hits the primary key, so exactly
+        one caller across all workers gets True; the rest get False. Used IDs
+        live in their own table and never enter the in-memory index: only
+        rotation checks them, and it checks the database.
+        """
+        db.add(UsedRefreshToken(token_id=token_id, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+
+    def load(self, db: Session) -> int:
+        """
+        Load revocations from the database and prune expired ones, including
+        expired used refresh token IDs.
+
+        The first call loads every live entry; later calls only fetch rows
+        revoked since the previous sync.
+
+        Returns:
+            Number of rows read.
+        """
+        now = datetime.now(timezone.utc)
+        query = select(RevokedToken).where(RevokedToken.expires_at > now)
+        if self._last_sync is not None:
+            # Overlap slightly so rows committed during the last sync aren't missed
+            query = query.where(RevokedToken.revoked_at > self._last_sync - timedelta(seconds=self.sync_interval))
+        rows = db.exec(query).all()
+        self._last_sync = now
+
+        self._add({row.token_id: _epoch(row.expires_at) for row in rows})
+        with self._lock:
+            cutoff = time.time()
+            for token_id in [k for k, expiry in self._revoked.items() if expiry <= cutoff]:
+                del self._revoked[token_id]
+        for model in (RevokedToken, UsedRefreshToken):
+            db.execute(
+                delete(model).where(model.expires_at <= now),
+                execution_options={"synchronize_session": False}
+            )
+        db.commit()
+        return len(rows)
+
+    def _load_with_new_session(self) -> int:
+        with Session(engine) as db:
+            return self.load(db)
+
+    async def start(self) -> None:
+        """
+        Load the index, then keep it in sync in the background. If the first
+        load fails the worker still starts; the sync task retries it.
+        """
+        try:
+            await asyncio.to_thread(self._load_with_new_session)
+            print(f"Revocation index loaded with {len(self)} entries.")
+        except Exception as e:
+            print(f"Error loading revocation index: {e}")
+        if self._task is None and self.sync_interval > 0:
+            self._task = asyncio.create_task(self._sync(), name="revocation-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sync(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await asyncio.to_thread(self._load_with_new_session)
+            except Exception as e:
+                print(f"Error syncing revocation index: {e}")
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_index = RevocationIndex()
@@ -0,0 +1,141 @@
+"""
+Room-affinity scheduling: each room's database work runs on one shard.
+"""
+import asyncio
+import bisect
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, TypeVar
+from sqlmodel import Session
+from app.config import settings
+from app.database import engine
+
+T = TypeVar("T")
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class ConsistentHashRing:
+    """
+    Maps keys to nodes on a hash ring with virtual nodes, so changing the
+    number of shards only moves about 1/N of the rooms.
+    """
+
+    def __init__(self, nodes: List[int], vnodes: int = 64):
+        self._ring = sorted((_hash(f"{node}:{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in self._ring]
+
+    def get_node(self, key: str) -> int:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+class RoomSequencer:
+    """
+    Keeps per-room fan-out in submission order.
+
+    Jobs for a room complete on its shard in the order they were submitted,
+    but their handlers resume on the event loop and may interleave while
+    awaiting socket sends. Each job takes a ticket when it is submitted and
+    waits for all earlier tickets of the room before broadcasting.
+    """
+
+    def __init__(self):
+        self._next_ticket: Dict[str, int] = {}
+        self._serving: Dict[str, int] = {}
+        self._finished: Dict[str, Set[int]] = {}
+        self._changed: Dict[str, asyncio.Condition] = {}
+
+    @asynccontextmanager
+    async def ordered(self, room_id: str) -> AsyncIterator[Callable[[], Any]]:
+        """
+        Take a ticket for the room. The yielded coroutine function waits for
+        this ticket's turn; the ticket is released on exit, even on error.
+        """
+        ticket = self._next_ticket.get(room_id, 0)
+        self._next_ticket[room_id] = ticket + 1
+        self._serving.setdefault(room_id, 0)
+        self._finished.setdefault(room_id, set())
+        changed = self._changed.setdefault(room_id, asyncio.Condition())
+
+        async def wait_turn():
+            async with changed:
+                await changed.wait_for(lambda: self._serving[room_id] == ticket)
+
+        try:
+            yield wait_turn
+        finally:
+            self._finished[room_id].add(ticket)
+            while self._serving[room_id] in self._finished[room_id]:
+                self._finished[room_id].remove(self._serving[room_id])
+                self._serving[room_id] += 1
+            if self._serving[room_id] == self._next_ticket[room_id]:
+                # Room idle; drop its state so it doesn't accumulate
+                for state in (self._next_ticket, self._serving, self._finished, self._changed):
+                    state.pop(room_id, None)
+            async with changed:
+                changed.notify_all()
+
+
+class RoomShardPool:
+    """
+    Runs blocking per-room work (persistence, history loads) on shards.
+
+    Each shard is a single-threaded executor, so a room's jobs run one at a
+    time in submission order, and a hot room only delays the rooms that hash
+    to the same shard instead of stalling the event loop serving every
+    socket. Jobs get their own database session on the shard thread.
+
+    With ``shards=0`` jobs run inline with the caller's session, which is
+    the unsharded behaviour.
+    """
+
+    def __init__(self, shards: int = settings.ROOM_SHARDS, vnodes: int = settings.ROOM_SHARD_VNODES):
+        self.shards = max(0, shards)
+        self._ring = ConsistentHashRing(list(range(self.shards)), vnodes) if self.shards else None
+        self._executors: List[ThreadPoolExecutor] = []
+        self.sequencer = RoomSequencer()
+
+    @property
+    def enabled(self) -> bool:
+        return self.shards > 0
+
+    def shard_for(self, room_id: str) -> Optional[int]:
+        return self._ring.get_node(room_id) if self._ring else None
+
+    async def start(self) -> None:
+        if self.enabled and not self._executors:
+            self._executors = [
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"room-shard-{i}")
+                for i in range(self.shards)
+            ]
+            print(f"Room sharding enabled with {self.shards} shards.")
+
+    async def stop(self) -> None:
+        """Stop accepting jobs and wait for queued ones to finish."""
+        executors, self._executors = self._executors, []
+        for executor in executors:
+            await asyncio.to_thread(executor.shutdown, wait=True)
+
+    @staticmethod
+    def _run_with_session(job: Callable[[Session], T]) -> T:
+        with Session(engine) as db:
+            return job(db)
+
+    async def run(self, room_id: str, job: Callable[[Session], T], db: Session) -> T:
+        """
+        Run ``job(session)`` on the room's shard and return its result.
+
+        Args:
+            room_id: Room the job belongs to
+            job: Blocking function taking a database session
+            db: Caller's session, used only when sharding is disabled
+        """
+        if not self._executors:
+            return job(db)
+        executor = self._executors[self.shard_for(room_id)]
+        return await asyncio.wrap_future(executor.submit(self._run_with_session, job))
+
+
+room_shards = RoomShardPool()
@@ -5,6 +5,7 @@ from typing import Optional, List
 from sqlmodel import Session, select, update # Import update for direct updates
 from fastapi import HTTPException, status
 from app.models.user import User # This is your SQLModel User class
+from app.utils.cache import invalidate_user_responses
 from app.utils.security import get_password_hash
 from app.utils.enums import UserRole # Ensure UserRole is imported
 
@@ -110,6 +111,7 @@ class UserService:
         db_user = UserService.get_user_by_id(db, user_id)
         if not db_user:
             return None
+        previous_username = db_user.username
 
         update_data = user_data.model_dump(exclude_unset=True)
         # Update the fields in the SQLModel instance
@@ -119,6 +121,11 @@ class UserService:
         db.add(db_user) # Add the modified object back to the session
         db.commit()
         db.refresh(db_user)
+
+        # Cached profile/dashboard responses are stale now
+        invalidate_user_responses(previous_username)
+        if db_user.username != previous_username:
+            invalidate_user_responses(db_user.username)
         return db_user
 
     @staticmethod
@@ -132,4 +139,5 @@ class UserService:
         
         db.delete(db_user)
         db.commit()
+        invalidate_user_responses(db_user.username)
         return True
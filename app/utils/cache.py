@@ -0,0 +1,162 @@
+"""
+In-process response caching and conditional-request helpers.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import FileResponse
+from app.config import settings
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Sync endpoints run in a thread pool, so every operation takes a lock.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drop every string key starting with ``prefix``."""
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, str) and k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = TTLCache(maxsize=settings.RESPONSE_CACHE_MAXSIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+static_cache = TTLCache(maxsize=settings.STATIC_CACHE_MAXSIZE, ttl=settings.STATIC_CACHE_TTL_SECONDS)
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def user_cache_key(username: str, name: str) -> str:
+    return f"user:{username}:{name}"
+
+def invalidate_user_responses(username: str) -> None:
+    """Drop every cached response scoped to a user; called when the user changes."""
+    response_cache.invalidate_prefix(f"user:{username}:")
+
+def cached_json_response(
+    request: Request,
+    key: str,
+    build: Callable[[], Any],
+    max_age: int = settings.RESPONSE_CACHE_MAX_AGE_SECONDS
+) -> Response:
+    """
+    Serve a JSON payload from the response cache with ETag support.
+
+    The serialized body and its ETag are cached together, so a hit skips
+    both building and encoding the payload. Responses are marked private
+    because keys are scoped to the authenticated principal.
+
+    Args:
+        request: Incoming request, checked for If-None-Match
+        key: Cache key, including the principal
+        build: Produces the JSON-serializable payload on a miss
+        max_age: Seconds clients may reuse the response without revalidating
+
+    Returns:
+        200 with the body, or 304 if the client's copy is current.
+    """
+    cached = response_cache.get(key)
+    if cached is None:
+        body = json.dumps(build(), default=str, separators=(",", ":")).encode("utf-8")
+        cached = (body, make_etag(body))
+        response_cache.set(key, cached)
+    body, etag = cached
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}",
+        "Vary": "Authorization",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that adds Cache-Control and keeps small files in memory.
+
+    Starlette already answers If-None-Match/If-Modified-Since with 304;
+    this avoids re-reading unchanged small files from disk on every 200.
+    Cached bodies are keyed by path, mtime and size, so edits are picked
+    up immediately.
+    """
+
+    def __init__(self, *args, cache_control: str = "public, max-age=3600", max_file_size: int = 256 * 1024, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self.max_file_size = max_file_size
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.cache_control
+
+        request_headers = dict(scope.get("headers", []))
+        if (
+            not isinstance(response, FileResponse)
+            or stat_result.st_size > self.max_file_size
+            or scope.get("method") == "HEAD"
+            or b"range" in request_headers
+        ):
+            return response
+
+        key = (str(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+        body = static_cache.get(key)
+        if body is None:
+            with open(full_path, "rb") as f:
+                body = f.read()
+            static_cache.set(key, body)
+
+        headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "accept-ranges")}
+        return Response(content=body, status_code=status_code, headers=headers, media_type=response.media_type)
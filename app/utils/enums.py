@@ -6,4 +6,46 @@ from enum import Enum
 class UserRole(str, Enum):
     """User role enumeration."""
     ADMIN = "admin"
-    USER = "user"
\ No newline at end of file
+    USER = "user"
+
+class OutboxStatus(str, Enum):
+    """Delivery state of a notification outbox entry."""
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
+class TransferEntity(str, Enum):
+    """Tables supported by bulk import/export."""
+    USERS = "users"
+    ROOMS = "rooms"
+    MESSAGES = "messages"
+
+
+class TransferFormat(str, Enum):
+    """Serialization formats for bulk import/export."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class TokenType(str, Enum):
+    """JWT token types, carried in the ``type`` claim."""
+    ACCESS = "access"
+    REFRESH = "refresh"
+
+
+class MessageAction(str, Enum):
+    """Mutations a client can request over the chat WebSocket."""
+    EDIT = "edit"
+    DELETE = "delete"
+    REACT = "react"
+    UNREACT = "unreact"
+
+
+class ChatEventType(str, Enum):
+    """Event types sent to chat WebSocket clients."""
+    MESSAGE = "message"
+    MESSAGE_EDITED = "message_edited"
+    MESSAGE_DELETED = "message_deleted"
+    REACTION = "reaction"
@@ -0,0 +1,88 @@
+"""
+Startup profiling helpers built on ``python -X importtime``.
+"""
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ImportTiming(NamedTuple):
+    """One line of ``-X importtime`` output; times are in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def profile_imports(module: str = "main") -> List[ImportTiming]:
+    """
+    Import a module in a fresh interpreter and collect its import timings.
+
+    A subprocess is used so nothing already imported by the caller hides
+    the real cold-start cost.
+
+    Raises:
+        RuntimeError: If the module fails to import
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header row
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+def imports_of(timings: List[ImportTiming], module: str) -> List[ImportTiming]:
+    """
+    Return the timings for ``module`` and everything it imported.
+
+    Children are printed before their parent, so the block runs from just
+    after the previous top-level entry up to and including ``module``.
+    """
+    end = next((i for i in range(len(timings) - 1, -1, -1)
+                if timings[i].module == module and timings[i].depth == 0), None)
+    if end is None:
+        return []
+    start = end
+    while start > 0 and timings[start - 1].depth > 0:
+        start -= 1
+    return timings[start:end + 1]
+
+def time_by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Sum self time per top-level package, slowest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split(".")[0]] += timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def format_startup_report(timings: List[ImportTiming], module: str = "main", top: int = 15) -> str:
+    """Render a plain-text import-time breakdown."""
+    timings = imports_of(timings, module)
+    total_us = timings[-1].cumulative_us if timings else 0
+    lines = [f"Import of '{module}': {total_us / 1000:.1f} ms ({len(timings)} modules)", ""]
+
+    lines.append(f"Top {top} packages by self time:")
+    for package, self_us in list(time_by_package(timings).items())[:top]:
+        share = 100 * self_us / total_us if total_us else 0
+        lines.append(f"  {self_us / 1000:8.1f} ms  {share:5.1f}%  {package}")
+
+    lines.append("")
+    lines.append(f"Top {top} direct imports of '{module}' by cumulative time:")
+    direct = [t for t in timings if t.depth == 1]
+    for timing in sorted(direct, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.module}")
+    return "\n".join(lines)
@@ -1,20 +1,48 @@
 """
 FastAPI application initialization and configuration.
 """
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import create_db_and_tables
-from app.routers import user, auth, chat
-import os
+from app.routers import user, auth, chat, admin
+from app.services.outbox_worker import outbox_worker
+from app.services.reaction_aggregator import reaction_aggregator
+from app.services.revocation_index import revocation_index
+from app.services.room_shards import room_shards
+from app.utils.cache import CachedStaticFiles
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background services on worker boot and stop them on shutdown.
+
+    Schema creation is left to `python manage.py bootstrap` unless
+    DB_AUTO_CREATE is set, so scaling out workers doesn't re-run it.
+    """
+    if settings.DB_AUTO_CREATE:
+        create_db_and_tables()
+    await revocation_index.start()
+    await reaction_aggregator.start()
+    await room_shards.start()
+    if settings.OUTBOX_ENABLED:
+        await outbox_worker.start()
+    yield
+    # In-flight outbox entries are retried after their lease expires
+    await outbox_worker.stop()
+    # Let queued room jobs finish before the final reaction flush
+    await room_shards.stop()
+    # Writes out reaction counts still held in memory
+    await reaction_aggregator.stop()
+    await revocation_index.stop()
 
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -25,18 +53,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.mount("/static", StaticFiles(directory="static"), name="static")
+static_files = CachedStaticFiles(
+    directory="static",
+    cache_control=f"public, max-age={settings.STATIC_MAX_AGE_SECONDS}",
+    max_file_size=settings.STATIC_CACHE_MAX_FILE_BYTES
+)
+app.mount("/static", static_files, name="static")
 
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR)
 app.include_router(user.router, prefix=settings.API_V1_STR)
 app.include_router(chat.router, prefix=settings.API_V1_STR)
-
-# Create database tables on startup
-@app.on_event("startup")
-def startup_event():
-    """Create database tables on application startup."""
-    create_db_and_tables()
+app.include_router(admin.router, prefix=settings.API_V1_STR)
 
 
 # Health check
@@ -45,17 +73,16 @@ def health_check():
     return {"status": "healthy"}
 
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """
     Serves the index.html file from the static directory at the root URL.
+    Goes through the static mount so it gets the same in-memory cache and ETag
+    handling; raises 404 if the file is missing.
     """
-    index_html_path = os.path.join("static", "index.html")
-    
-    # Check if the file exists to avoid a server error
-    if not os.path.exists(index_html_path):
-        raise HTTPException(status_code=404, detail="index.html not found")
-        
-    return FileResponse(index_html_path, media_type="text/html")
+    response = await static_files.get_response("index.html", request.scope)
+    # The page itself must pick up new deployments, so always revalidate
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 if __name__ == "__main__":
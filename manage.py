@@ -0,0 +1,137 @@
+"""
+Command-line management tasks.
+
+Usage:
+    python manage.py bootstrap
+    python manage.py startup-report
+    python manage.py export users --format csv --output users.csv
+    python manage.py import messages --input messages.ndjson --chunk-size 10000
+    python manage.py soak --clients 2000 --duration 60
+"""
+import argparse
+import sys
+from fastapi import HTTPException
+from app.config import settings
+from app.utils.enums import TransferEntity, TransferFormat
+
+# Command handlers import what they need, so each command only loads its own dependencies
+
+def _quiet_engine():
+    """The app's engine with SQL echo off; echo logs to stdout and would corrupt exports."""
+    from app.database import engine
+    engine.echo = False
+    return engine
+
+def bootstrap_command(args: argparse.Namespace) -> None:
+    """Create the database schema; run once per deployment, not per worker."""
+    from app.database import create_db_and_tables
+    create_db_and_tables()
+    print("Database tables created.", file=sys.stderr)
+
+def startup_report_command(args: argparse.Namespace) -> None:
+    """Print an import-time breakdown of a cold application start."""
+    from app.utils.profiling import profile_imports, format_startup_report
+    print(format_startup_report(profile_imports(args.module), args.module, args.top))
+
+def export_command(args: argparse.Namespace) -> None:
+    """Stream a table to a file or stdout, password hashes included."""
+    from sqlmodel import Session
+    from app.services.transfer_service import TransferService
+
+    engine = _quiet_engine()
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        with Session(engine) as db:
+            # Includes password hashes, so users can be migrated without resetting passwords
+            records = TransferService.export_records(db, args.entity, args.chunk_size, include_secrets=True)
+            out.writelines(TransferService.serialize(records, args.entity, args.format, include_secrets=True))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+def import_command(args: argparse.Namespace) -> None:
+    """Bulk import a file or stdin into a table."""
+    from sqlmodel import Session
+    from app.services.transfer_service import TransferService
+
+    engine = _quiet_engine()
+    source = open(args.input, encoding="utf-8", newline="") if args.input else sys.stdin
+    try:
+        with Session(engine) as db:
+            records = TransferService.parse(source, args.format)
+            result = TransferService.import_records(db, args.entity, records, args.chunk_size, args.format)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(f"Imported {result['imported']} {args.entity.value} in {result['chunks']} chunks.", file=sys.stderr)
+
+def soak_command(args: argparse.Namespace) -> int:
+    """
+    Hammer ConnectionManager with randomized concurrent clients; exit 1 on
+    violations or leaks. The harness lives in tests/, so this needs a checkout.
+    """
+    import asyncio
+    from tests.soak import soak, format_soak_report
+
+    duration = args.duration if args.duration is not None or args.rounds is not None else 30.0
+    report = asyncio.run(soak(
+        duration=duration,
+        seed=args.seed,
+        max_rounds=args.rounds,
+        clients=args.clients,
+        rooms=args.rooms,
+        failure_rate=args.failure_rate,
+        max_latency=args.max_latency_ms / 1000
+    ))
+    print(format_soak_report(report))
+    return 0 if report.ok else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Chat application management tasks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bootstrap_parser = commands.add_parser("bootstrap", help="Create database tables.")
+    bootstrap_parser.set_defaults(handler=bootstrap_command)
+
+    report_parser = commands.add_parser("startup-report", help="Show an import-time breakdown of application startup.")
+    report_parser.add_argument("--module", default="main", help="Module to import (defaults to main)")
+    report_parser.add_argument("--top", type=int, default=15, help="Rows per section")
+    report_parser.set_defaults(handler=startup_report_command)
+
+    transfer_options = argparse.ArgumentParser(add_help=False)
+    transfer_options.add_argument("entity", type=TransferEntity, metavar="{" + ",".join(e.value for e in TransferEntity) + "}")
+    transfer_options.add_argument("--format", type=TransferFormat, default=TransferFormat.NDJSON, metavar="{" + ",".join(f.value for f in TransferFormat) + "}")
+    transfer_options.add_argument("--chunk-size", type=int, default=settings.TRANSFER_CHUNK_SIZE)
+
+    export_parser = commands.add_parser("export", parents=[transfer_options], help="Export a table as NDJSON or CSV.")
+    export_parser.add_argument("--output", "-o", help="Output file (defaults to stdout)")
+    export_parser.set_defaults(handler=export_command)
+
+    import_parser = commands.add_parser("import", parents=[transfer_options], help="Bulk import NDJSON or CSV into a table.")
+    import_parser.add_argument("--input", "-i", help="Input file (defaults to stdin)")
+    import_parser.set_defaults(handler=import_command)
+
+    soak_parser = commands.add_parser("soak", help="Run a concurrency soak test against the WebSocket connection manager.")
+    soak_parser.add_argument("--clients", type=int, default=1000, help="Simulated clients per round")
+    soak_parser.add_argument("--rooms", type=int, default=20)
+    soak_parser.add_argument("--duration", type=float, help="Seconds to run (default 30 unless --rounds is given)")
+    soak_parser.add_argument("--rounds", type=int, help="Stop after this many rounds; without --duration rounds run untimed, so --seed replays a failure")
+    soak_parser.add_argument("--seed", type=int, default=0, help="Seed of the first round; each round uses the next one")
+    soak_parser.add_argument("--failure-rate", type=float, default=0.01, help="Probability that a socket accept or send fails")
+    soak_parser.add_argument("--max-latency-ms", type=float, default=0.0, help="Random send latency; 0 keeps rounds deterministic")
+    soak_parser.set_defaults(handler=soak_command)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        exit_code = args.handler(args)
+    except HTTPException as e:
+        # Services report bad input as HTTPExceptions; show the detail rather than a traceback
+        print(f"Error: {e.detail}", file=sys.stderr)
+        return 1
+    return exit_code or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
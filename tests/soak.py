@@ -0,0 +1,304 @@
+"""
+Concurrency soak harness for ConnectionManager.
+
+Simulates thousands of clients joining, leaving, broadcasting, failing and
+being revoked against a real ConnectionManager with fake WebSockets, and
+checks the manager's bookkeeping as it goes. One manager lives for the
+whole soak, like the router's, so anything a round leaves behind shows up
+as leaked connections and memory growth. Each round is driven by its own
+seed; with ``max_latency=0`` and no time limit all delays are event-loop
+yields, so a round's interleaving is fully reproducible from its seed.
+
+Test-only code: tests/test_connection_manager.py runs short seeded rounds
+under pytest, and ``python manage.py soak`` runs long ones from a checkout.
+"""
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional
+from app.services.connection_manager import ConnectionManager
+
+# A timed soak is split into at least this many rounds, so memory growth
+# and latency drift always have several rounds to compare
+MIN_TIMED_ROUNDS = 4
+
+class InjectedFailure(RuntimeError):
+    """Failure raised on purpose by a FakeWebSocket."""
+
+
+class FakeWebSocket:
+    """
+    In-memory stand-in for a Starlette WebSocket.
+
+    Every call yields to the event loop a random number of times (and
+    optionally sleeps up to ``max_latency`` seconds) so operations from
+    different clients interleave, and fails with probability
+    ``failure_rate``. After a send fails the socket stays broken.
+    """
+
+    def __init__(self, client_id: int, seed: int, max_yields: int = 3, max_latency: float = 0.0, failure_rate: float = 0.0):
+        self.client_id = client_id
+        self.rng = random.Random(f"{seed}:{client_id}")
+        self.max_yields = max_yields
+        self.max_latency = max_latency
+        self.failure_rate = failure_rate
+        self.accepted = False
+        self.closed = False
+        self.broken = False
+        self.received = 0
+
+    async def _delay(self) -> None:
+        for _ in range(self.rng.randint(0, self.max_yields)):
+            await asyncio.sleep(0)
+        if self.max_latency > 0:
+            await asyncio.sleep(self.rng.uniform(0, self.max_latency))
+
+    async def accept(self) -> None:
+        await self._delay()
+        if self.rng.random() < self.failure_rate:
+            raise InjectedFailure("accept failed")
+        self.accepted = True
+
+    async def send_text(self, message: str) -> None:
+        await self._delay()
+        if self.closed or self.broken:
+            raise InjectedFailure("socket is closed")
+        if self.rng.random() < self.failure_rate:
+            self.broken = True
+            raise InjectedFailure("send failed")
+        self.received += 1
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None) -> None:
+        await self._delay()
+        self.closed = True
+
+
+def check_invariants(manager: ConnectionManager) -> List[str]:
+    """Return descriptions of every inconsistency in the manager's indexes."""
+    problems = []
+    by_room: Dict[str, set] = {}
+    by_user: Dict[str, int] = {}
+    by_token: Dict[str, set] = {}
+    for websocket, (room_id, username, token_ids) in manager.connection_info.items():
+        by_room.setdefault(room_id, set()).add(websocket)
+        if username is not None:
+            by_user[username] = by_user.get(username, 0) + 1
+        for token_id in token_ids:
+            by_token.setdefault(token_id, set()).add(websocket)
+
+    rooms = {room_id: set(sockets) for room_id, sockets in manager.active_connections.items()}
+    if rooms != by_room:
+        problems.append(f"active_connections out of sync with connection_info ({len(rooms)} vs {len(by_room)} rooms)")
+    if any(not sockets for sockets in manager.active_connections.values()):
+        problems.append("empty room left in active_connections")
+    if manager.online_users != by_user:
+        problems.append("online_users counts do not match open sockets")
+    tokens = {token_id: set(sockets) for token_id, sockets in manager.token_connections.items()}
+    if tokens != by_token:
+        problems.append("token_connections out of sync with connection_info")
+    return problems
+
+
+def _new_manager(max_latency: float) -> ConnectionManager:
+    # Thousands of clients saturate the event loop, so a tight timeout would
+    # fail sends and closes because of the harness rather than the sockets
+    return ConnectionManager(send_timeout=max(60.0, max_latency * 10), verbose=False)
+
+
+class RoundResult(NamedTuple):
+    seed: int
+    sessions: int
+    broadcasts: int
+    injected_failures: int
+    violations: List[str]
+    leaked_connections: int
+    broadcast_latencies: List[float]
+    traced_memory: int
+
+
+class SoakReport(NamedTuple):
+    rounds: List[RoundResult]
+    elapsed: float
+
+    @property
+    def violations(self) -> List[str]:
+        return [f"seed {r.seed}: {v}" for r in self.rounds for v in r.violations]
+
+    @property
+    def leaked_connections(self) -> int:
+        return sum(r.leaked_connections for r in self.rounds)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations and not self.leaked_connections
+
+
+async def run_round(
+    seed: int,
+    manager: Optional[ConnectionManager] = None,
+    clients: int = 1000,
+    rooms: int = 20,
+    users: int = 200,
+    max_ops: int = 8,
+    max_yields: int = 3,
+    max_latency: float = 0.0,
+    failure_rate: float = 0.01,
+    revoke_rate: float = 0.05,
+    check_every: int = 50,
+    deadline: Optional[float] = None,
+) -> RoundResult:
+    """
+    Run one randomized round: every client connects, performs up to
+    ``max_ops`` random operations and leaves, all concurrently.
+
+    Clients mirror websocket_endpoint: ``disconnect`` always runs in a
+    ``finally``, even if ``connect`` failed, and is sometimes called twice.
+    Invariants are checked after every ``check_every`` operations (a full
+    check is linear in open sockets) and once all clients have left.
+    Revocations go through ``close_revoked``, the listener the revocation
+    index calls. Past ``deadline`` (``time.monotonic()``), clients leave
+    instead of starting another operation.
+    """
+    rng = random.Random(seed)
+    if manager is None:
+        manager = _new_manager(max_latency)
+    room_ids = [f"room-{i}" for i in range(rooms)]
+    violations: List[str] = []
+    latencies: List[float] = []
+    counters = {"broadcasts": 0, "injected": 0, "ops": 0}
+    # One plan per client, drawn up front so the schedule can't change the draws
+    plans = [
+        (rng.choice(room_ids), f"user-{rng.randrange(users)}", f"sid-{rng.randrange(users * 2)}",
+         [rng.random() for _ in range(rng.randint(1, max_ops))])
+        for _ in range(clients)
+    ]
+
+    def check(where: str) -> None:
+        for problem in check_invariants(manager):
+            violations.append(f"{where}: {problem}")
+
+    dropped: List[FakeWebSocket] = []
+
+    async def client(client_id: int) -> None:
+        room_id, username, session_id, ops = plans[client_id]
+        websocket = FakeWebSocket(client_id, seed, max_yields, max_latency, failure_rate)
+        try:
+            await manager.connect(websocket, room_id, username, [session_id])
+            for op in ops:
+                if websocket not in manager.connection_info:
+                    # Dropped by the manager (failed send or revocation). It must
+                    # close the socket, or the real handler would never find out.
+                    dropped.append(websocket)
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if op < 0.6:
+                    started = time.perf_counter()
+                    await manager.broadcast({"from": client_id}, room_ids[int(op * 1000) % rooms])
+                    latencies.append(time.perf_counter() - started)
+                    counters["broadcasts"] += 1
+                elif op < 0.6 + revoke_rate:
+                    manager.close_revoked([session_id])
+                    await asyncio.sleep(0)
+                elif op < 0.75:
+                    break  # Client leaves early
+                else:
+                    await asyncio.sleep(0)
+                counters["ops"] += 1
+                if counters["ops"] % check_every == 0:
+                    check(f"client {client_id}")
+        except InjectedFailure:
+            counters["injected"] += 1
+        finally:
+            manager.disconnect(websocket)
+            if websocket.client_id % 7 == 0:
+                manager.disconnect(websocket)
+
+    results = await asyncio.gather(*(client(i) for i in range(clients)), return_exceptions=True)
+    for client_id, result in enumerate(results):
+        if isinstance(result, BaseException):
+            violations.append(f"client {client_id} raised {result!r}")
+    check("end of round")
+    await manager.wait_closed()
+    unclosed = [websocket.client_id for websocket in dropped if not websocket.closed]
+    if unclosed:
+        violations.append(f"{len(unclosed)} dropped sockets never closed, e.g. client {unclosed[0]}")
+
+    # Everyone has left, so any socket or count still indexed is a leak
+    leaked = (
+        len(manager.connection_info)
+        + sum(len(sockets) for sockets in manager.active_connections.values())
+        + sum(len(sockets) for sockets in manager.token_connections.values())
+        + sum(manager.online_users.values())
+    )
+    traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    return RoundResult(seed, clients, counters["broadcasts"], counters["injected"], violations, leaked, latencies, traced)
+
+
+async def soak(duration: Optional[float] = 30.0, seed: int = 0, max_rounds: Optional[int] = None, **round_options) -> SoakReport:
+    """
+    Run rounds with consecutive seeds against one manager, tracking memory
+    across rounds.
+
+    With a ``duration``, each round is cut off after ``duration /
+    MIN_TIMED_ROUNDS`` seconds and no round runs past the overall deadline,
+    so large rounds can't overrun it. With ``duration=None``, exactly
+    ``max_rounds`` rounds run to completion, which keeps them reproducible.
+    """
+    if duration is None and max_rounds is None:
+        raise ValueError("Give a duration, max_rounds or both")
+    manager = _new_manager(round_options.get("max_latency", 0.0))
+    tracemalloc.start()
+    started = time.monotonic()
+    end = started + duration if duration is not None else None
+    rounds: List[RoundResult] = []
+    try:
+        while (end is None or time.monotonic() < end) and (max_rounds is None or len(rounds) < max_rounds):
+            deadline = min(end, time.monotonic() + duration / MIN_TIMED_ROUNDS) if end is not None else None
+            rounds.append(await run_round(seed + len(rounds), manager, deadline=deadline, **round_options))
+    finally:
+        tracemalloc.stop()
+    return SoakReport(rounds, time.monotonic() - started)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def format_soak_report(report: SoakReport) -> str:
+    """Render a plain-text summary: failures, leaks, memory growth and latency drift."""
+    rounds = report.rounds
+    lines = [
+        f"Rounds: {len(rounds)} in {report.elapsed:.1f} s "
+        f"(seeds {rounds[0].seed}-{rounds[-1].seed})" if rounds else "Rounds: 0",
+        f"Sessions: {sum(r.sessions for r in rounds)}, broadcasts: {sum(r.broadcasts for r in rounds)}, "
+        f"injected failures: {sum(r.injected_failures for r in rounds)}",
+        f"Leaked connections: {report.leaked_connections}",
+    ]
+
+    violations = report.violations
+    lines.append(f"Invariant violations: {len(violations)}")
+    lines.extend(f"  {violation}" for violation in violations[:10])
+    if len(violations) > 10:
+        lines.append(f"  ... {len(violations) - 10} more")
+
+    if len(rounds) >= 2:
+        # Skip the first round: it pays for one-off allocations
+        baseline = rounds[1].traced_memory if len(rounds) > 2 else rounds[0].traced_memory
+        growth = rounds[-1].traced_memory - baseline
+        lines.append(f"Traced memory: {baseline / 1024:.0f} KiB -> {rounds[-1].traced_memory / 1024:.0f} KiB ({growth / 1024:+.0f} KiB)")
+
+        quarter = max(1, len(rounds) // 4)
+        early = statistics.median(_percentile(r.broadcast_latencies, 0.5) for r in rounds[:quarter])
+        late = statistics.median(_percentile(r.broadcast_latencies, 0.5) for r in rounds[-quarter:])
+        drift = (late - early) / early * 100 if early else 0.0
+        lines.append(f"Broadcast p50: {early * 1e3:.1f} ms (first {quarter} rounds) -> {late * 1e3:.1f} ms (last {quarter}), drift {drift:+.1f}%")
+        lines.append(f"Broadcast p99 (last round): {_percentile(rounds[-1].broadcast_latencies, 0.99) * 1e3:.1f} ms")
+
+    lines.append("Result: " + ("OK" if report.ok else "FAILED"))
+    return "\n".join(lines)
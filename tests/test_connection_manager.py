@@ -0,0 +1,64 @@
+"""
+Seeded concurrency checks for ConnectionManager, driven by the soak harness.
+"""
+import asyncio
+import pytest
+from app.services.connection_manager import ConnectionManager
+from tests.soak import FakeWebSocket, check_invariants, run_round
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_round_keeps_indexes_consistent(seed):
+    result = asyncio.run(run_round(seed, clients=200, rooms=5, users=40, failure_rate=0.05, check_every=5))
+    assert result.violations == []
+    assert result.leaked_connections == 0
+
+def test_round_is_reproducible_from_seed():
+    first, second = (asyncio.run(run_round(7, clients=100, rooms=3)) for _ in range(2))
+    assert (first.broadcasts, first.injected_failures) == (second.broadcasts, second.injected_failures)
+
+def test_disconnect_is_idempotent():
+    async def scenario():
+        manager = ConnectionManager(verbose=False)
+        websocket = FakeWebSocket(1, seed=0)
+        manager.disconnect(FakeWebSocket(2, seed=0))  # Never connected
+        await manager.connect(websocket, "room", "alice", ["sid"])
+        manager.disconnect(websocket)
+        manager.disconnect(websocket)
+        return manager
+    manager = asyncio.run(scenario())
+    assert (manager.connection_info, manager.active_connections, manager.online_users, manager.token_connections) == ({}, {}, {}, {})
+
+def test_failed_send_drops_and_closes_socket():
+    async def scenario():
+        manager = ConnectionManager(verbose=False)
+        good, bad = FakeWebSocket(1, seed=0), FakeWebSocket(2, seed=0)
+        await manager.connect(good, "room", "alice", ["sid-a"])
+        await manager.connect(bad, "room", "bob", ["sid-b"])
+        bad.broken = True
+        await manager.broadcast({"content": "hi"}, "room")
+        await manager.wait_closed()
+        return manager, good, bad
+    manager, good, bad = asyncio.run(scenario())
+    assert good.received == 1 and not good.closed
+    assert bad.closed
+    assert list(manager.connection_info) == [good]
+    assert manager.online_users == {"alice": 1}
+    assert check_invariants(manager) == []
+
+def test_close_revoked_from_another_thread():
+    async def scenario():
+        manager = ConnectionManager(verbose=False)
+        revoked = [FakeWebSocket(i, seed=0) for i in range(2)]
+        other = FakeWebSocket(3, seed=0)
+        for websocket in revoked:
+            await manager.connect(websocket, "room", "alice", ["sid-a"])
+        await manager.connect(other, "room", "bob", ["sid-b"])
+        await asyncio.to_thread(manager.close_revoked, ["sid-a"])
+        await asyncio.sleep(0)  # Run the callback scheduled from the thread
+        await manager.wait_closed()
+        return manager, revoked, other
+    manager, revoked, other = asyncio.run(scenario())
+    assert all(websocket.closed for websocket in revoked)
+    assert not other.closed
+    assert list(manager.connection_info) == [other]
+    assert check_invariants(manager) == []
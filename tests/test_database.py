@@ -0,0 +1,27 @@
+"""
+Schema upgrades applied by ``manage.py bootstrap``.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, create_engine
+from app.database import add_missing_columns
+from app.models.message import Message
+
+def test_add_missing_columns_upgrades_old_messages_table():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as connection:
+        # messages as created before edits and deletes existed
+        connection.execute(text(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY, room_id VARCHAR NOT NULL, "
+            "user_id INTEGER NOT NULL, content VARCHAR NOT NULL, timestamp DATETIME NOT NULL)"
+        ))
+        connection.execute(text("INSERT INTO messages VALUES (1, 'general', 1, 'hi', '2024-01-01 00:00:00')"))
+
+    add_missing_columns(engine)
+    add_missing_columns(engine)  # Idempotent
+
+    columns = {column["name"] for column in inspect(engine).get_columns("messages")}
+    assert {"edited_at", "deleted"} <= columns
+    with Session(engine) as db:
+        message = db.get(Message, 1)
+        assert (message.edited_at, message.deleted) == (None, False)